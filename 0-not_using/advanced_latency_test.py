@@ -9,12 +9,21 @@ import time
 import json
 import socket
 import threading
-import statistics
-import subprocess
+import array
+import queue
+import selectors
+import ctypes
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 import os
 import re
 
+import numpy as np
+
+from binary_protocol import DS4BinaryProtocol
+
 # DS4 Controller IDs
 VENDOR_ID = 1356
 PRODUCT_ID = 2508
@@ -23,24 +32,132 @@ PRODUCT_ID = 2508
 UDP_HOST = '127.0.0.1'
 UDP_PORT = 12345
 
+# Outgoing packet ring capacity (power of two so indices wrap with a mask)
+TX_RING_SIZE = 1024
+TX_RING_MASK = TX_RING_SIZE - 1
+
+# Upper bound on button presses per run
+MAX_TESTS = 1000
+
+# macOS QoS class for latency-sensitive threads (<sys/qos.h>)
+QOS_CLASS_USER_INTERACTIVE = 0x21
+
+def boost_current_thread():
+    """Give the calling thread realtime/interactive scheduling where the OS allows it
+    
+    Returns the previous settings for restore_current_thread(), or None if nothing changed.
+    """
+    if sys.platform.startswith('linux'):
+        previous = (os.sched_getscheduler(0), os.sched_getparam(0), os.sched_getaffinity(0))
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(80))
+        except PermissionError:
+            print("⚠️  SCHED_FIFO needs root/CAP_SYS_NICE, keeping default scheduling")
+        # Pin to a single core (not core 0, which services most interrupts)
+        try:
+            os.sched_setaffinity(0, {max(previous[2])})
+        except OSError as e:
+            print(f"⚠️  Could not pin thread to a core: {e}")
+        return previous
+    elif sys.platform == 'darwin':
+        try:
+            libsystem = ctypes.CDLL('/usr/lib/libSystem.dylib')
+            libsystem.pthread_self.restype = ctypes.c_void_p
+            qos = ctypes.c_uint()
+            relpri = ctypes.c_int()
+            libsystem.pthread_get_qos_class_np(ctypes.c_void_p(libsystem.pthread_self()),
+                                               ctypes.byref(qos), ctypes.byref(relpri))
+            libsystem.pthread_set_qos_class_self_np(QOS_CLASS_USER_INTERACTIVE, 0)
+            return (qos.value, relpri.value)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  Could not raise thread QoS: {e}")
+    return None
+
+def restore_current_thread(previous):
+    """Undo boost_current_thread() using the settings it returned"""
+    if previous is None:
+        return
+    try:
+        if sys.platform.startswith('linux'):
+            policy, param, cpus = previous
+            os.sched_setscheduler(0, policy, param)
+            os.sched_setaffinity(0, cpus)
+        elif sys.platform == 'darwin':
+            libsystem = ctypes.CDLL('/usr/lib/libSystem.dylib')
+            libsystem.pthread_set_qos_class_self_np(*previous)
+    except (OSError, AttributeError) as e:
+        print(f"⚠️  Could not restore thread scheduling: {e}")
+
+# Hammerspoon (controller.processBinaryData) echoes each packet back to this port
+# once it has injected the key
+# (12346 is already taken by the UI's IPC socket)
+ACK_PORT = 12347
+
+# (name, mask) pairs for the packed button flags, in DS4BinaryProtocol bit order
+BUTTON_MASKS = tuple(
+    (name, 1 << i) for i, name in enumerate(DS4BinaryProtocol.BUTTON_MAPPING[:12])
+)
+
 class AdvancedLatencyTester:
     def __init__(self):
         self.device = None
         self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Connected, non-blocking socket: send() skips the per-packet address copy
+        self._addr = (UDP_HOST, UDP_PORT)
+        self.udp_socket.setblocking(False)
+        self.udp_socket.connect(self._addr)
+        
+        # Press detection only enqueues packets; a background thread drains them
+        # Single-producer/single-consumer ring: packets are packed in place into
+        # fixed slots; the poll loop only advances _tx_head, the sender only _tx_tail
+        self._tx_ring = bytearray(TX_RING_SIZE * DS4BinaryProtocol.PACKET_SIZE)
+        self._tx_view = memoryview(self._tx_ring)
+        self._tx_head = 0
+        self._tx_tail = 0
+        self.tx_dropped = 0  # Packets dropped because the ring was full
+        # Set by the producer after each enqueue so the idle sender sleeps instead of polling
+        self._tx_wake = threading.Event()
+        self._tx_running = True
+        self._tx_thread = threading.Thread(target=self._tx_drain, daemon=True)
+        self._tx_thread.start()
+        
         self.running = False
         self.test_button = 'cross'
-        self.press_times = []
-        self.key_detection_times = []
-        self.latencies = []
+        # Unboxed storage: int64 perf_counter_ns() timestamps, float64 latencies in ms
+        self.press_times = array.array('q')
+        self.key_detection_times = array.array('q')
+        self.latencies = array.array('d')
+        self._prev_flags = 0
+        
+        # Reusable report buffer; parsing is skipped when the button bytes are unchanged
+        self._buf = bytearray(64)
+        self._mv = memoryview(self._buf)
+        self._prev_button_byte1 = 0
+        self._prev_button_byte2 = 0
+        
+        # Console output is queued as (tag, ts_ns, value) and formatted by a logger thread
+        self._log_q = queue.SimpleQueue()
+        self._log_thread = None
+        
+        # Result files are written off the calling thread
+        self._io_executor = ThreadPoolExecutor(max_workers=1)
         
         # For key event detection
-        self.key_log_process = None
-        self.key_events = []
+        self.ack_socket = None
+        self.key_events = array.array('q')
         
     def connect_controller(self):
         """Connect to DS4 controller"""
         try:
             self.device = hid.Device(vid=VENDOR_ID, pid=PRODUCT_ID)
+            # Keep stale reports from queuing in the driver's input buffer:
+            # - Windows: the driver ring defaults to 32 reports and is normally cut to 2
+            #   with HidD_SetNumInputBuffers, but that call needs the HANDLE hidapi opened,
+            #   which hid.Device does not expose (the buffer count is per handle).
+            # - macOS/Linux: there is no public API for the IOHIDDevice/hidraw queue depth.
+            # On every platform, non-blocking reads plus read_latest_report() draining the
+            # queue each tick keep worst-case staleness to about one report.
+            self.device.nonblocking = True
             print(f"✅ Connected to DS4 Controller")
             return True
         except Exception as e:
@@ -48,28 +165,18 @@ class AdvancedLatencyTester:
             return False
     
     def start_key_monitoring(self):
-        """Start monitoring for key events using log stream"""
+        """Start listening for key-injection acks from Hammerspoon"""
         try:
-            # Monitor Console.app for key events
-            cmd = [
-                'log', 'stream', 
-                '--predicate', 'process == "Hammerspoon" AND eventMessage CONTAINS "Controller"',
-                '--style', 'compact'
-            ]
-            
-            self.key_log_process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            self.ack_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.ack_socket.bind((UDP_HOST, ACK_PORT))
+            self.ack_socket.setblocking(False)
             
             # Start monitoring thread
             monitor_thread = threading.Thread(target=self.monitor_key_events)
             monitor_thread.daemon = True
             monitor_thread.start()
             
-            print("✅ Started key event monitoring")
+            print(f"✅ Listening for key acks on UDP port {ACK_PORT}")
             return True
             
         except Exception as e:
@@ -77,59 +184,120 @@ class AdvancedLatencyTester:
             return False
     
     def monitor_key_events(self):
-        """Monitor for key events in log stream"""
-        while self.running and self.key_log_process:
+        """Monitor for key-injection acks (the echoed binary packet)"""
+        log = self._log_q.put_nowait
+        # epoll/kqueue wait with a 10ms timeout so shutdown is noticed promptly
+        sel = selectors.DefaultSelector()
+        sel.register(self.ack_socket, selectors.EVENT_READ)
+        while self.running and self.ack_socket:
             try:
-                line = self.key_log_process.stdout.readline()
-                if line:
-                    # Look for controller key events
-                    if "Controller -> Key:" in line:
-                        event_time = time.time()
-                        self.key_events.append(event_time)
-                        print(f"🔑 Key event detected at {event_time:.6f}")
-                        
-                        # Match with most recent button press
-                        if self.press_times:
-                            latency = (event_time - self.press_times[-1]) * 1000  # Convert to ms
-                            self.latencies.append(latency)
-                            print(f"   Latency: {latency:.2f}ms")
-                            
+                if not sel.select(timeout=0.01):
+                    continue
+                data, _ = self.ack_socket.recvfrom(DS4BinaryProtocol.PACKET_SIZE)
+                event_ns = time.perf_counter_ns()
+                self.key_events.append(event_ns)
+                
+                # Match with most recent button press
+                latency = None
+                if self.press_times:
+                    latency = (event_ns - self.press_times[-1]) / 1e6  # Convert to ms
+                    self.latencies.append(latency)
+                log(('key', event_ns, latency))
+                    
+            except BlockingIOError:
+                continue
             except Exception as e:
                 if self.running:
-                    print(f"Error monitoring keys: {e}")
+                    log(('error', time.perf_counter_ns(), f"Error monitoring keys: {e}"))
                 break
+        sel.close()
     
     def parse_controller_data(self, report):
-        """Parse controller data"""
+        """Parse button state into packed flags (DS4BinaryProtocol bit layout)
+        
+        Returns None when the button bytes have not changed since the last report.
+        """
         button_byte1 = report[5]
         button_byte2 = report[6]
+        if button_byte1 == self._prev_button_byte1 and button_byte2 == self._prev_button_byte2:
+            return None
+        self._prev_button_byte1 = button_byte1
+        self._prev_button_byte2 = button_byte2
         
-        buttons = {
-            'square': bool(button_byte1 & 0x10),
-            'cross': bool(button_byte1 & 0x20),
-            'circle': bool(button_byte1 & 0x40),
-            'triangle': bool(button_byte1 & 0x80),
-            'l1': bool(button_byte2 & 0x01),
-            'r1': bool(button_byte2 & 0x02),
-            'l2_pressed': bool(button_byte2 & 0x04),
-            'r2_pressed': bool(button_byte2 & 0x08),
-            'share': bool(button_byte2 & 0x10),
-            'options': bool(button_byte2 & 0x20),
-            'l3': bool(button_byte2 & 0x40),
-            'r3': bool(button_byte2 & 0x80)
-        }
-        
-        return buttons
+        # Face buttons live in the high nibble of byte 5, shoulder/stick buttons in byte 6
+        return ((button_byte1 >> 4) & 0x0F) | (button_byte2 << 4)
     
-    def send_udp_data(self, buttons):
-        """Send button data via UDP"""
-        data = {
-            'buttons': buttons,
-            'dpad': 'none',
-            'timestamp': time.time()
-        }
-        message = json.dumps(data).encode('utf-8')
-        self.udp_socket.sendto(message, (UDP_HOST, UDP_PORT))
+    def send_udp_data(self, flags):
+        """Queue packed button flags for UDP transmission (9-byte binary packet)"""
+        head = self._tx_head
+        # Never block the poll loop: when the ring is full, drop the new packet.
+        # Only the sender advances _tx_tail, so the producer must not touch it.
+        if head - self._tx_tail >= TX_RING_SIZE:
+            self.tx_dropped += 1
+            return
+        DS4BinaryProtocol.pack_flags_into(
+            self._tx_ring, (head & TX_RING_MASK) * DS4BinaryProtocol.PACKET_SIZE,
+            flags, DS4BinaryProtocol.DPAD_MAPPING['none']
+        )
+        # Single int stores are atomic under the GIL, so no lock is needed
+        self._tx_head = head + 1
+        self._tx_wake.set()
+    
+    def _tx_drain(self):
+        """Send queued packets one datagram each, blocking on _tx_wake while the ring is empty"""
+        size = DS4BinaryProtocol.PACKET_SIZE
+        view = self._tx_view
+        wake = self._tx_wake
+        log = self._log_q.put_nowait
+        # Used only to wait for buffer space after a BlockingIOError
+        sel = selectors.DefaultSelector()
+        sel.register(self.udp_socket, selectors.EVENT_WRITE)
+        while self._tx_running:
+            tail = self._tx_tail
+            if tail == self._tx_head:
+                # Clearing before the re-check means a set() racing with it is never lost
+                wake.wait()
+                wake.clear()
+                continue
+            offset = (tail & TX_RING_MASK) * size
+            try:
+                self.udp_socket.send(view[offset:offset + size])
+            except BlockingIOError:
+                sel.select(timeout=0.01)  # Socket buffer full, retry once writable
+                continue
+            except OSError as e:
+                # Drop the packet rather than retrying it forever
+                if self._tx_running:
+                    log(('error', time.perf_counter_ns(), f"UDP send error: {e}"))
+            self._tx_tail = tail + 1
+        sel.close()
+    
+    def _log_worker(self):
+        """Format and print queued (tag, ts_ns, value) events until the None sentinel arrives"""
+        while True:
+            event = self._log_q.get()
+            if event is None:
+                break
+            tag, ts_ns, value = event
+            if tag == 'press':
+                print(f"Test {value}: Button pressed at {ts_ns}ns")
+            elif tag == 'key':
+                print(f"🔑 Key event detected at {ts_ns}ns")
+                if value is not None:
+                    print(f"   Latency: {value:.2f}ms")
+            else:
+                print(value)
+    
+    def read_latest_report(self, timeout_ms=10):
+        """Wait for a report, then drain the HID buffer and return only the newest one"""
+        latest = self.device.read(64, timeout=timeout_ms)
+        if not latest:
+            return None
+        while True:
+            report = self.device.read(64, timeout=0)
+            if not report:
+                return latest
+            latest = report
     
     def measure_latency(self):
         """Measure end-to-end latency with key detection"""
@@ -138,37 +306,48 @@ class AdvancedLatencyTester:
         print("Monitoring for actual key events in system...")
         print("Press Ctrl+C to stop and see results\n")
         
-        previous_state = False
+        previous_sched = boost_current_thread()
+        log = self._log_q.put_nowait
+        
+        test_mask = dict(BUTTON_MASKS)[self.test_button]
+        self._prev_flags = 0
         test_count = 0
+        press_deadline_ns = 0
         
-        while self.running and test_count < 30:  # Max 30 tests
-            try:
-                report = self.device.read(64)
-                if report:
-                    buttons = self.parse_controller_data(report)
-                    current_state = buttons[self.test_button]
+        # Only the measurement loop runs boosted; summary and file IO use normal scheduling
+        try:
+            while self.running and test_count < MAX_TESTS:
+                try:
+                    report = self.read_latest_report()
+                    if report:
+                        self._buf[:len(report)] = report
+                        flags = self.parse_controller_data(self._mv)
+                        if flags is None:
+                            continue
                     
-                    # Detect button press (rising edge)
-                    if current_state and not previous_state:
-                        press_time = time.time()
-                        self.press_times.append(press_time)
-                        
-                        # Send UDP data immediately
-                        self.send_udp_data(buttons)
+                        # Detect button press (rising edge)
+                        # Presses inside the previous press's key-event window are ignored
+                        if (flags ^ self._prev_flags) & flags & test_mask and time.perf_counter_ns() >= press_deadline_ns:
+                            press_ns = time.perf_counter_ns()
+                            press_deadline_ns = press_ns + 100_000_000  # 100ms
+                            self.press_times.append(press_ns)
                         
-                        test_count += 1
-                        print(f"Test {test_count}: Button pressed at {press_time:.6f}")
+                            # Send UDP data immediately
+                            self.send_udp_data(flags)
                         
-                        # Wait a bit for key event
-                        time.sleep(0.1)
+                            test_count += 1
+                            log(('press', press_ns, test_count))
                     
-                    previous_state = current_state
+                        self._prev_flags = flags
                     
-            except KeyboardInterrupt:
-                break
-            except Exception as e:
-                print(f"Error reading controller: {e}")
-                break
+                except KeyboardInterrupt:
+                    log(('info', time.perf_counter_ns(), "\n⏹️  Test interrupted by user"))
+                    break
+                except Exception as e:
+                    log(('error', time.perf_counter_ns(), f"Error reading controller: {e}"))
+                    break
+        finally:
+            restore_current_thread(previous_sched)
         
         self.running = False
     
@@ -180,90 +359,123 @@ class AdvancedLatencyTester:
         print(f"Total button presses: {len(self.press_times)}")
         print(f"Total key events detected: {len(self.key_events)}")
         print(f"Successful latency measurements: {len(self.latencies)}")
+        if self.tx_dropped:
+            print(f"UDP packets dropped (send ring full): {self.tx_dropped}")
         print(f"Test button: {self.test_button}")
         print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         if self.latencies:
+            stats = self.latency_statistics()
+            total = stats['count']
             print(f"\n⏱️  END-TO-END LATENCY (ms):")
-            print(f"  Min: {min(self.latencies):.2f}")
-            print(f"  Max: {max(self.latencies):.2f}")
-            print(f"  Mean: {statistics.mean(self.latencies):.2f}")
-            print(f"  Median: {statistics.median(self.latencies):.2f}")
-            print(f"  Std Dev: {statistics.stdev(self.latencies):.2f}")
+            print(f"  Min: {stats['min']:.2f}")
+            print(f"  Max: {stats['max']:.2f}")
+            print(f"  Mean: {stats['mean']:.2f}")
+            print(f"  Median: {stats['median']:.2f}")
+            print(f"  Std Dev: {stats['std_dev']:.2f}")
+            print(f"  P95: {stats['p95']:.2f}  P99: {stats['p99']:.2f}  P99.9: {stats['p99_9']:.2f}")
             
             # Performance analysis
             print(f"\n📈 PERFORMANCE ANALYSIS:")
-            fast_responses = [l for l in self.latencies if l < 10]
-            medium_responses = [l for l in self.latencies if 10 <= l < 20]
-            slow_responses = [l for l in self.latencies if l >= 20]
+            fast, medium, slow = stats['fast'], stats['medium'], stats['slow']
             
-            print(f"  Fast responses (<10ms): {len(fast_responses)} ({len(fast_responses)/len(self.latencies)*100:.1f}%)")
-            print(f"  Medium responses (10-20ms): {len(medium_responses)} ({len(medium_responses)/len(self.latencies)*100:.1f}%)")
-            print(f"  Slow responses (≥20ms): {len(slow_responses)} ({len(slow_responses)/len(self.latencies)*100:.1f}%)")
+            print(f"  Fast responses (<10ms): {fast} ({fast/total*100:.1f}%)")
+            print(f"  Medium responses (10-20ms): {medium} ({medium/total*100:.1f}%)")
+            print(f"  Slow responses (≥20ms): {slow} ({slow/total*100:.1f}%)")
             
-            if slow_responses:
-                print(f"  ⚠️  Slowest response: {max(self.latencies):.2f}ms")
+            if slow:
+                print(f"  ⚠️  Slowest response: {stats['max']:.2f}ms")
             
         else:
             print("\n❌ No latency measurements captured")
             print("Possible issues:")
             print("- Hammerspoon not running")
             print("- No controller mappings configured")
-            print("- Key events not being logged")
+            print(f"- Hammerspoon not acking key events on port {ACK_PORT}")
         
         # Save detailed results
         self.save_results()
     
+    def latency_statistics(self):
+        """Summarise the captured latencies (ms) with vectorized numpy reductions"""
+        arr = np.asarray(self.latencies, dtype=np.float32)
+        p50, p95, p99, p99_9 = np.percentile(arr, [50, 95, 99, 99.9])
+        fast = int(np.count_nonzero(arr < 10))
+        slow = int(np.count_nonzero(arr >= 20))
+        return {
+            'count': int(arr.size),
+            'min': float(arr.min()),
+            'max': float(arr.max()),
+            'mean': float(arr.mean()),
+            'median': float(p50),
+            'std_dev': float(arr.std(ddof=1)) if arr.size > 1 else 0.0,
+            'p95': float(p95),
+            'p99': float(p99),
+            'p99_9': float(p99_9),
+            'fast': fast,
+            'medium': int(arr.size) - fast - slow,
+            'slow': slow,
+        }
+    
     def save_results(self):
         """Save detailed test results"""
         results = {
             'timestamp': datetime.now().isoformat(),
+            'wall_clock': time.time(),
             'test_button': self.test_button,
             'total_presses': len(self.press_times),
             'total_key_events': len(self.key_events),
             'successful_measurements': len(self.latencies),
-            'press_times': self.press_times,
-            'key_event_times': self.key_events,
-            'latencies_ms': self.latencies,
+            'press_times_ns': self.press_times.tolist(),
+            'key_event_times_ns': self.key_events.tolist(),
+            'latencies_ms': self.latencies.tolist(),
             'statistics': {}
         }
         
         if self.latencies:
+            stats = self.latency_statistics()
             results['statistics'] = {
-                'min': min(self.latencies),
-                'max': max(self.latencies),
-                'mean': statistics.mean(self.latencies),
-                'median': statistics.median(self.latencies),
-                'std_dev': statistics.stdev(self.latencies)
+                key: stats[key]
+                for key in ('min', 'max', 'mean', 'median', 'std_dev', 'p95', 'p99', 'p99_9')
             }
         
         filename = f"../exports/advanced_latency_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        
-        with open(filename, 'w') as f:
-            json.dump(results, f, indent=2)
-        
-        print(f"\n💾 Detailed results saved to: {filename}")
+        self._io_executor.submit(self._write_results, Path(filename), results)
+    
+    @staticmethod
+    def _write_results(path, results):
+        """Write results atomically (temp file + rename), compact JSON"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(results, f)
+            os.replace(tmp_path, path)
+            print(f"\n💾 Detailed results saved to: {path}")
+        except OSError as e:
+            print(f"\n❌ Failed to save results: {e}")
     
     def run_test(self):
         """Run the complete advanced latency test"""
         if not self.connect_controller():
             return
         
+        # Must be set before the monitor thread starts, or its loop exits immediately
+        self.running = True
+        
+        self._log_thread = threading.Thread(target=self._log_worker, daemon=True)
+        self._log_thread.start()
+        
+        # Key monitoring runs in the background; measurement stays on the main
+        # thread so Ctrl+C (SIGINT) is delivered straight to the poll loop
         if not self.start_key_monitoring():
             print("⚠️  Continuing without key monitoring...")
         
-        self.running = True
-        
-        # Start measurement thread
-        test_thread = threading.Thread(target=self.measure_latency)
-        test_thread.start()
+        self.measure_latency()
         
-        try:
-            test_thread.join()
-        except KeyboardInterrupt:
-            print("\n⏹️  Test interrupted by user")
-            self.running = False
+        # Flush pending log lines before printing the summary
+        self._log_q.put(None)
+        self._log_thread.join()
         
         self.calculate_statistics()
         self.cleanup()
@@ -272,14 +484,20 @@ class AdvancedLatencyTester:
         """Clean up resources"""
         self.running = False
         
-        if self.key_log_process:
-            self.key_log_process.terminate()
-            self.key_log_process.wait()
+        if self.ack_socket:
+            self.ack_socket.close()
+            self.ack_socket = None
         
         if self.device:
             self.device.close()
         
+        self._tx_running = False
+        self._tx_wake.set()
+        self._tx_thread.join(timeout=1.0)
         self.udp_socket.close()
+        
+        # Let any pending result write finish
+        self._io_executor.shutdown(wait=True)
         print("\n🧹 Cleanup completed")
 
 def main():
@@ -295,7 +513,7 @@ def main():
     print("1. DS4 controller connected")
     print("2. Hammerspoon running with controller module")
     print("3. Controller mappings configured")
-    print("4. Console.app access for key monitoring")
+    print(f"4. Hammerspoon echoing packets to UDP port {ACK_PORT} after key injection")
     
     tester = AdvancedLatencyTester()
     tester.run_test()
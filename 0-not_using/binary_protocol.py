@@ -7,14 +7,21 @@ Efficient binary format for UDP transmission
 import struct
 import time
 
+def _crc8(byte, poly=0x07):
+    """CRC-8 (polynomial x^8 + x^2 + x + 1) of a single byte"""
+    crc = byte
+    for _ in range(8):
+        crc = ((crc << 1) ^ poly) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
 class DS4BinaryProtocol:
     """Binary protocol for DS4 controller data transmission"""
     
     # Packet format: [header, button_flags_low, button_flags_high, dpad, timestamp_low, timestamp_high, checksum]
-    # Total: 8 bytes (vs ~100+ bytes for JSON)
+    # Total: 9 bytes (vs ~100+ bytes for JSON); checksum is a CRC-8 over the first 8 bytes
     
     PACKET_HEADER = 0x44  # 'D' for DS4
-    PACKET_SIZE = 8
+    PACKET_SIZE = 9
     
     # Button bit mapping (16 buttons = 2 bytes)
     BUTTON_MAPPING = [
@@ -30,6 +37,15 @@ class DS4BinaryProtocol:
         'ne': 5, 'se': 6, 'sw': 7, 'nw': 8
     }
     
+    # D-pad value -> name (index matches DPAD_MAPPING values)
+    _DPAD_REVERSE = tuple(DPAD_MAPPING.keys())
+    
+    # Precompiled packet layout
+    _PACKER = struct.Struct('<BBBBHHB')
+    
+    # CRC-8 lookup table: crc = _CRC_TBL[crc ^ byte] per byte
+    _CRC_TBL = bytes(_crc8(i) for i in range(256))
+    
     @classmethod
     def pack_digital_state(cls, buttons, dpad='none'):
         """Pack button and d-pad state into binary format"""
@@ -45,17 +61,57 @@ class DS4BinaryProtocol:
         # Get timestamp (32-bit)
         timestamp = int(time.time() * 1000)  # Convert to milliseconds
         
-        # Pack into 8-byte packet
-        packet = struct.pack('<BBBBHH',
-            cls.PACKET_HEADER,           # 1 byte: Header
-            button_flags & 0xFF,         # 1 byte: Button flags low
-            (button_flags >> 8) & 0xFF,  # 1 byte: Button flags high
-            dpad_value,                  # 1 byte: D-pad
-            timestamp & 0xFFFF,          # 2 bytes: Timestamp low
-            (timestamp >> 16) & 0xFFFF,  # 2 bytes: Timestamp high
-        )
+        return cls.pack_flags(button_flags, dpad_value, timestamp)
+    
+    @classmethod
+    def pack_flags(cls, flags, dpad_int=0, ts_ms=None):
+        """Pack already-encoded button flags (BUTTON_MAPPING bit order) and d-pad value"""
+        return cls._PACKER.pack(*cls._packet_fields(flags, dpad_int, ts_ms))
+    
+    @classmethod
+    def pack_flags_into(cls, buffer, offset, flags, dpad_int=0, ts_ms=None):
+        """Like pack_flags, but writes into a caller-owned writable buffer (no allocation)"""
+        cls._PACKER.pack_into(buffer, offset, *cls._packet_fields(flags, dpad_int, ts_ms))
+    
+    @classmethod
+    def _packet_fields(cls, flags, dpad_int, ts_ms):
+        """Struct field values for a packet, including the CRC-8 byte"""
+        if ts_ms is None:
+            ts_ms = int(time.time() * 1000)
+        low = flags & 0xFF
+        high = (flags >> 8) & 0xFF
+        ts_low = ts_ms & 0xFFFF
+        ts_high = (ts_ms >> 16) & 0xFFFF
+        
+        # CRC over the 8 body bytes, unrolled (timestamps are little-endian)
+        tbl = cls._CRC_TBL
+        crc = tbl[cls.PACKET_HEADER]
+        crc = tbl[crc ^ low]
+        crc = tbl[crc ^ high]
+        crc = tbl[crc ^ dpad_int]
+        crc = tbl[crc ^ (ts_low & 0xFF)]
+        crc = tbl[crc ^ (ts_low >> 8)]
+        crc = tbl[crc ^ (ts_high & 0xFF)]
+        crc = tbl[crc ^ (ts_high >> 8)]
         
-        return packet
+        return (
+            cls.PACKET_HEADER,  # 1 byte: Header
+            low,                # 1 byte: Button flags low
+            high,               # 1 byte: Button flags high
+            dpad_int,           # 1 byte: D-pad
+            ts_low,             # 2 bytes: Timestamp low
+            ts_high,            # 2 bytes: Timestamp high
+            crc,                # 1 byte: Checksum
+        )
+    
+    @classmethod
+    def checksum(cls, data):
+        """CRC-8 of a bytes-like object"""
+        tbl = cls._CRC_TBL
+        crc = 0
+        for b in data:
+            crc = tbl[crc ^ b]
+        return crc
     
     @classmethod
     def unpack_digital_state(cls, packet):
@@ -63,8 +119,12 @@ class DS4BinaryProtocol:
         if len(packet) != cls.PACKET_SIZE:
             raise ValueError(f"Invalid packet size: {len(packet)} bytes")
         
+        # Reject corrupted packets before doing any decoding work
+        if cls.checksum(packet[:-1]) != packet[-1]:
+            raise ValueError("Invalid packet checksum")
+        
         # Unpack packet
-        header, button_low, button_high, dpad_value, timestamp_low, timestamp_high = struct.unpack('<BBBBHH', packet)
+        header, button_low, button_high, dpad_value, timestamp_low, timestamp_high, _ = cls._PACKER.unpack(packet)
         
         # Verify header
         if header != cls.PACKET_HEADER:
@@ -79,8 +139,7 @@ class DS4BinaryProtocol:
             buttons[button] = (button_flags & (1 << i)) != 0
         
         # Unpack d-pad
-        dpad_names = list(cls.DPAD_MAPPING.keys())
-        dpad = dpad_names[dpad_value] if dpad_value < len(dpad_names) else 'none'
+        dpad = cls._DPAD_REVERSE[dpad_value] if dpad_value < len(cls._DPAD_REVERSE) else 'none'
         
         # Reconstruct timestamp
         timestamp = timestamp_low + (timestamp_high * 65536)
@@ -99,14 +158,19 @@ class DS4BinaryProtocol:
     
     @classmethod
     def get_json_equivalent_size(cls, buttons, dpad):
-        """Estimate JSON packet size for comparison"""
-        json_data = {
-            'buttons': buttons,
-            'dpad': dpad,
-            'timestamp': time.time()
-        }
-        import json
-        return len(json.dumps(json_data).encode('utf-8'))
+        """Estimate JSON packet size for comparison
+        
+        Computed from the fixed json.dumps layout instead of encoding:
+        {"buttons": {"name": true, ...}, "dpad": "...", "timestamp": 1234567890.123}
+        """
+        size = len('{"buttons": {}, "dpad": "", "timestamp": }')
+        for name, pressed in buttons.items():
+            size += len(name) + len('"": ') + (4 if pressed else 5)  # true / false
+        if buttons:
+            size += 2 * (len(buttons) - 1)  # ", " separators
+        size += len(dpad)
+        size += len(repr(time.time()))
+        return size
 
 # Example usage and testing
 if __name__ == "__main__":
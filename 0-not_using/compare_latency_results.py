@@ -6,11 +6,67 @@ Compares multiple latency test results and generates performance reports
 
 import json
 import os
-import statistics
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import matplotlib.pyplot as plt
 import numpy as np
 
+# Mean-latency category boundaries (ms) and the matching report lines
+_CATEGORY_EDGES = np.array([10., 20.])
+_CATEGORY_LINES = (
+    "- ✅ **Excellent performance**: Mean latency under 10ms\n",
+    "- ⚠️ **Good performance**: Mean latency under 20ms\n",
+    "- ❌ **Poor performance**: Mean latency over 20ms\n",
+)
+
+def _decimate(a, n=2000):
+    """Stride-sample a trace down to ~n points; returns (sample indices, values)"""
+    if a.size <= n:
+        return np.arange(a.size), a
+    idx = np.linspace(0, a.size - 1, n).astype(np.intp)
+    return idx, a[idx]
+
+def summarize_latencies(data):
+    """Attach the latency array and its summary to a loaded result, computed once"""
+    if not data.get('latencies_ms'):
+        return
+    # Millisecond samples don't need float64; float32 halves memory traffic
+    arr = np.asarray(data['latencies_ms'], np.float32)
+    data['_arr'] = arr
+    # One sort yields the median and the box-plot quartiles
+    q = np.percentile(arr, [0, 25, 50, 75, 100])
+    data['_summary'] = {
+        'n': arr.size,
+        'mean': float(arr.mean(dtype=np.float64)),
+        'median': float(q[2]),
+        'min': float(q[0]),
+        'max': float(q[4]),
+    }
+    # Precomputed stats for Axes.bxp, so plotting doesn't re-sort the samples
+    data['_bxp'] = {
+        'med': q[2], 'q1': q[1], 'q3': q[3],
+        'whislo': q[0], 'whishi': q[4], 'fliers': [],
+        'label': data['filename'].replace('advanced_latency_test_', '').replace('.json', ''),
+    }
+
+def _parse_one(filepath):
+    """Load and summarize a single result file; returns None on error"""
+    filename = os.path.basename(filepath)
+    try:
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
+        data['filename'] = filename
+        summarize_latencies(data)
+        print(f"✅ Loaded: {filename}")
+        return data
+    except Exception as e:
+        print(f"❌ Error loading {filename}: {e}")
+        return None
+
 def load_test_results(directory="../exports"):
     """Load all latency test results from exports directory"""
     results = []
@@ -19,17 +75,18 @@ def load_test_results(directory="../exports"):
         print(f"❌ Exports directory not found: {directory}")
         return results
     
-    for filename in os.listdir(directory):
-        if filename.startswith(("latency_test_", "advanced_latency_test_")) and filename.endswith(".json"):
-            filepath = os.path.join(directory, filename)
-            try:
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                    data['filename'] = filename
-                    results.append(data)
-                print(f"✅ Loaded: {filename}")
-            except Exception as e:
-                print(f"❌ Error loading {filename}: {e}")
+    # DirEntry carries the name and full path, so no per-file os.path.join
+    with os.scandir(directory) as it:
+        files = [e.path for e in it
+                 if e.is_file() and e.name.endswith(".json") and e.name.startswith(("latency_test_", "advanced_latency_test_"))]
+    if not files:
+        return results
+    
+    # File reads and parsing overlap across threads; map() keeps directory order
+    with ThreadPoolExecutor(max_workers=min(8, len(files))) as ex:
+        for data in ex.map(_parse_one, files):
+            if data is not None:
+                results.append(data)
     
     return results
 
@@ -68,33 +125,40 @@ def analyze_results(results):
     # Performance trends
     if len(advanced_tests) > 1:
         print(f"\n📊 PERFORMANCE TRENDS:")
-        latencies = []
-        timestamps = []
+        measured = [test for test in advanced_tests if '_arr' in test]
+        # One vectorized ISO-8601 parse instead of fromisoformat per test
+        timestamps = np.array([test['timestamp'] for test in measured], dtype='datetime64[us]')
+        latencies = np.concatenate([test['_arr'] for test in measured]) if measured else None
         
-        for test in advanced_tests:
-            if 'latencies_ms' in test and test['latencies_ms']:
-                latencies.extend(test['latencies_ms'])
-                timestamps.append(datetime.fromisoformat(test['timestamp']))
-        
-        if latencies:
-            print(f"  Total measurements: {len(latencies)}")
-            print(f"  Overall mean: {statistics.mean(latencies):.2f}ms")
-            print(f"  Overall median: {statistics.median(latencies):.2f}ms")
-            print(f"  Best performance: {min(latencies):.2f}ms")
-            print(f"  Worst performance: {max(latencies):.2f}ms")
+        if latencies is not None:
+            arr = latencies
+            total = arr.size
+            print(f"  Total measurements: {total}")
+            print(f"  Test period: {timestamps.min().astype(datetime):%Y-%m-%d %H:%M} → {timestamps.max().astype(datetime):%Y-%m-%d %H:%M}")
+            print(f"  Overall mean: {arr.mean(dtype=np.float64):.2f}ms")
+            print(f"  Overall median: {np.median(arr):.2f}ms")
+            print(f"  Best performance: {arr.min():.2f}ms")
+            print(f"  Worst performance: {arr.max():.2f}ms")
             
             # Performance categories
-            fast = [l for l in latencies if l < 10]
-            medium = [l for l in latencies if 10 <= l < 20]
-            slow = [l for l in latencies if l >= 20]
+            fast = np.count_nonzero(arr < 10)
+            medium = np.count_nonzero((arr >= 10) & (arr < 20))
+            slow = total - fast - medium
             
             print(f"\n  Performance Distribution:")
-            print(f"    Fast (<10ms): {len(fast)} ({len(fast)/len(latencies)*100:.1f}%)")
-            print(f"    Medium (10-20ms): {len(medium)} ({len(medium)/len(latencies)*100:.1f}%)")
-            print(f"    Slow (≥20ms): {len(slow)} ({len(slow)/len(latencies)*100:.1f}%)")
+            print(f"    Fast (<10ms): {fast} ({fast/total*100:.1f}%)")
+            print(f"    Medium (10-20ms): {medium} ({medium/total*100:.1f}%)")
+            print(f"    Slow (≥20ms): {slow} ({slow/total*100:.1f}%)")
 
-def create_visualization(results, output_dir="../exports"):
-    """Create visualization charts for test results"""
+def create_visualization(results, output_dir="../exports", show=False):
+    """Create visualization charts for test results (shown interactively only if show=True)"""
+    # matplotlib is only needed here; importing it lazily keeps text-only runs fast
+    import matplotlib
+    # Batch runs only write PNGs: use the non-interactive Agg backend
+    if __name__ == "__main__" or os.environ.get('PS4_HEADLESS'):
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
     advanced_tests = [r for r in results if r['filename'].startswith('advanced_latency_test_')]
     
     if not advanced_tests:
@@ -102,40 +166,36 @@ def create_visualization(results, output_dir="../exports"):
         return
     
     # Prepare data for plotting
-    all_latencies = []
-    test_names = []
-    
-    for test in advanced_tests:
-        if 'latencies_ms' in test and test['latencies_ms']:
-            all_latencies.append(test['latencies_ms'])
-            test_names.append(test['filename'].replace('advanced_latency_test_', '').replace('.json', ''))
+    measured = [test for test in advanced_tests if '_arr' in test]
+    all_latencies = [test['_arr'] for test in measured]
+    test_names = [test['_bxp']['label'] for test in measured]
     
     if not all_latencies:
         print("❌ No latency data for visualization")
         return
     
     # Create box plot
-    plt.figure(figsize=(12, 8))
+    fig = plt.figure(figsize=(12, 8))
     
     plt.subplot(2, 2, 1)
-    plt.boxplot(all_latencies, labels=test_names)
+    plt.gca().bxp([test['_bxp'] for test in measured], showfliers=False)
     plt.title('Latency Distribution Comparison')
     plt.ylabel('Latency (ms)')
     plt.xticks(rotation=45)
     
     # Create histogram
     plt.subplot(2, 2, 2)
-    all_data = [item for sublist in all_latencies for item in sublist]
-    plt.hist(all_data, bins=20, alpha=0.7, edgecolor='black')
+    all_data = np.concatenate(all_latencies)
+    counts, edges = np.histogram(all_data, bins=20)
+    plt.bar(edges[:-1], counts, width=np.diff(edges), align='edge', alpha=0.7, edgecolor='black')
     plt.title('Overall Latency Distribution')
     plt.xlabel('Latency (ms)')
     plt.ylabel('Frequency')
     
     # Create performance over time
     plt.subplot(2, 2, 3)
-    for i, test in enumerate(advanced_tests):
-        if 'latencies_ms' in test and test['latencies_ms']:
-            plt.plot(test['latencies_ms'], label=test_names[i], alpha=0.7)
+    for name, latencies in zip(test_names, all_latencies):
+        plt.plot(*_decimate(latencies), label=name, alpha=0.7, rasterized=True)
     plt.title('Latency Over Time')
     plt.xlabel('Test Number')
     plt.ylabel('Latency (ms)')
@@ -143,8 +203,8 @@ def create_visualization(results, output_dir="../exports"):
     
     # Create performance summary
     plt.subplot(2, 2, 4)
-    means = [statistics.mean(latencies) for latencies in all_latencies]
-    medians = [statistics.median(latencies) for latencies in all_latencies]
+    means = [test['_summary']['mean'] for test in measured]
+    medians = [test['_summary']['median'] for test in measured]
     
     x = np.arange(len(test_names))
     width = 0.35
@@ -166,7 +226,9 @@ def create_visualization(results, output_dir="../exports"):
     plt.savefig(plot_filename, dpi=300, bbox_inches='tight')
     print(f"📊 Visualization saved: {plot_filename}")
     
-    plt.show()
+    if show:
+        plt.show()
+    plt.close(fig)
 
 def generate_report(results, output_dir="../exports"):
     """Generate a comprehensive performance report"""
@@ -176,51 +238,49 @@ def generate_report(results, output_dir="../exports"):
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     report_filename = os.path.join(output_dir, f"performance_report_{timestamp}.md")
     
-    with open(report_filename, 'w') as f:
-        f.write("# DS4 Controller Latency Performance Report\n\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        # Summary
-        f.write("## Summary\n\n")
-        basic_tests = [r for r in results if r['filename'].startswith('latency_test_')]
-        advanced_tests = [r for r in results if r['filename'].startswith('advanced_latency_test_')]
-        
-        f.write(f"- Total test files: {len(results)}\n")
-        f.write(f"- Basic tests: {len(basic_tests)}\n")
-        f.write(f"- Advanced tests: {len(advanced_tests)}\n\n")
-        
-        # Advanced test details
-        if advanced_tests:
-            f.write("## Advanced Test Results\n\n")
-            f.write("| Test | Measurements | Mean (ms) | Median (ms) | Min (ms) | Max (ms) |\n")
-            f.write("|------|--------------|-----------|-------------|----------|----------|\n")
-            
-            for test in advanced_tests:
-                if 'statistics' in test and test['statistics']:
-                    stats = test['statistics']
-                    f.write(f"| {test['filename']} | {test['successful_measurements']} | {stats['mean']:.2f} | {stats['median']:.2f} | {stats['min']:.2f} | {stats['max']:.2f} |\n")
-        
-        # Recommendations
-        f.write("\n## Performance Recommendations\n\n")
-        f.write("Based on the test results:\n\n")
+    lines = []
+    lines.append("# DS4 Controller Latency Performance Report\n\n")
+    lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+    
+    # Summary
+    lines.append("## Summary\n\n")
+    basic_tests = [r for r in results if r['filename'].startswith('latency_test_')]
+    advanced_tests = [r for r in results if r['filename'].startswith('advanced_latency_test_')]
+    
+    lines.append(f"- Total test files: {len(results)}\n")
+    lines.append(f"- Basic tests: {len(basic_tests)}\n")
+    lines.append(f"- Advanced tests: {len(advanced_tests)}\n\n")
+    
+    # Advanced test details
+    if advanced_tests:
+        lines.append("## Advanced Test Results\n\n")
+        lines.append("| Test | Measurements | Mean (ms) | Median (ms) | Min (ms) | Max (ms) |\n")
+        lines.append("|------|--------------|-----------|-------------|----------|----------|\n")
         
-        all_latencies = []
         for test in advanced_tests:
-            if 'latencies_ms' in test:
-                all_latencies.extend(test['latencies_ms'])
+            if 'statistics' in test and test['statistics']:
+                stats = test['statistics']
+                lines.append(f"| {test['filename']} | {test['successful_measurements']} | {stats['mean']:.2f} | {stats['median']:.2f} | {stats['min']:.2f} | {stats['max']:.2f} |\n")
+    
+    # Recommendations
+    lines.append("\n## Performance Recommendations\n\n")
+    lines.append("Based on the test results:\n\n")
+    
+    measured = [test for test in advanced_tests if '_arr' in test]
+    
+    if measured:
+        arr = np.concatenate([test['_arr'] for test in measured])
+        mean_latency = float(arr.mean(dtype=np.float64))
+        # side='right' keeps the original boundaries: <10 excellent, <20 good
+        idx = int(np.searchsorted(_CATEGORY_EDGES, mean_latency, side='right'))
+        lines.append(_CATEGORY_LINES[idx])
         
-        if all_latencies:
-            mean_latency = statistics.mean(all_latencies)
-            if mean_latency < 10:
-                f.write("- ✅ **Excellent performance**: Mean latency under 10ms\n")
-            elif mean_latency < 20:
-                f.write("- ⚠️ **Good performance**: Mean latency under 20ms\n")
-            else:
-                f.write("- ❌ **Poor performance**: Mean latency over 20ms\n")
-            
-            f.write(f"- Average latency: {mean_latency:.2f}ms\n")
-            f.write(f"- Best single measurement: {min(all_latencies):.2f}ms\n")
-            f.write(f"- Worst single measurement: {max(all_latencies):.2f}ms\n")
+        lines.append(f"- Average latency: {mean_latency:.2f}ms\n")
+        lines.append(f"- Best single measurement: {arr.min():.2f}ms\n")
+        lines.append(f"- Worst single measurement: {arr.max():.2f}ms\n")
+    
+    with open(report_filename, 'w') as f:
+        f.write(''.join(lines))
     
     print(f"📄 Performance report saved: {report_filename}")
 
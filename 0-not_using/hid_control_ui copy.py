@@ -22,6 +22,15 @@ import socket
 import os
 import threading
 import queue
+import collections
+import gc
+import re
+import hashlib
+import struct
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from PIL import Image, ImageTk, ImageDraw
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
@@ -34,6 +43,132 @@ VENDOR_ID = 1356
 PRODUCT_ID = 2508
 SETTINGS_FILE = "ds4_settings.json"
 
+# Binary UDP packet sent to Hammerspoon (21 bytes, decoded with string.unpack in controller.lua):
+#   u32 button bits (_PACKET_BUTTONS order), u8 raw d-pad (0=up .. 7=nw, 8=none),
+#   i16 x4 sticks centred on 0 (lx, ly, rx, ry), u16 x4 (l2, r2, touch x, touch y)
+_PACKET_FMT = '<IBhhhhHHHH'
+_PACKET = struct.Struct(_PACKET_FMT)
+# Bit i of the button field; matches report[5] >> 4 | report[6] << 4 | (report[7] & 0x03) << 12
+_PACKET_BUTTONS = ('square', 'cross', 'circle', 'triangle', 'l1', 'r1', 'l2', 'r2',
+                   'share', 'options', 'l3', 'r3', 'ps', 'touchpad')
+
+def pack_controller_packet(report, touchpad):
+    """Encode the fields Hammerspoon needs straight from a raw DS4 input report"""
+    buttons = (report[5] >> 4) | (report[6] << 4) | ((report[7] & 0x03) << 12)
+    return _PACKET.pack(buttons, report[5] & 0x0F,
+                        report[1] - 128, report[2] - 128, report[3] - 128, report[4] - 128,
+                        report[8], report[9], touchpad['x'] & 0xFFFF, touchpad['y'] & 0xFFFF)
+
+# Tk modifier keysyms -> captured modifier flag ('opt' for the macOS Option key)
+_MOD_KEYSYMS = {
+    'Control_L': 'ctrl', 'Control_R': 'ctrl',
+    'Option_L': 'opt', 'Option_R': 'opt', 'Alt_L': 'opt', 'Alt_R': 'opt',
+    'Shift_L': 'shift', 'Shift_R': 'shift',
+    'Meta_L': 'cmd', 'Meta_R': 'cmd', 'Command': 'cmd', 'Command_L': 'cmd', 'Command_R': 'cmd',
+}
+
+# Direct mapping for common Option+key combinations that produce special chars
+_OPTION_KEY_MAP = {
+    'ssharp': 's',           # Option+S
+    'partialderivative': 'd', # Option+D
+    'integral': 'b',         # Option+B
+    'mu': 'm',               # Option+M
+    'dead_acute': 'e',       # Option+E
+    'registered': 'r',       # Option+R
+    'trademark': '2',        # Option+2
+    'cent': '4',             # Option+4
+    'infinity': '5',         # Option+5
+    'section': '6',          # Option+6
+    'paragraph': '7',        # Option+7
+    'bullet': '8',           # Option+8
+    'ordfeminine': '9',      # Option+9
+    'masculine': '0',        # Option+0
+    'ae': "'",               # Option+'
+    'oe': 'q',               # Option+Q
+    'sum': 'w',              # Option+W
+    'dead_grave': '`',       # Option+`
+    'asciitilde': 'n',       # Option+N
+    'guillemotleft': '\\',   # Option+\
+    'guillemotright': '|',   # Option+|
+}
+
+# Hammerspoon modifier names for every (cmd, ctrl, opt, shift) combination, indexed by
+# a 4-bit mask (cmd=1, ctrl=2, opt=4, shift=8). 'opt' is written as 'alt' for Hammerspoon.
+MODS_LUA_NAMES = {}
+for _bits in range(16):
+    MODS_LUA_NAMES[_bits] = tuple(name for bit, name in ((1, 'cmd'), (2, 'ctrl'), (4, 'alt'), (8, 'shift')) if _bits & bit)
+del _bits
+
+def mods_to_bits(mods):
+    """Pack a {'cmd','ctrl','opt','shift'} flag dict into a MODS_LUA_NAMES index"""
+    return ((mods.get('cmd') and 1 or 0) | (mods.get('ctrl') and 2 or 0) |
+            (mods.get('opt') and 4 or 0) | (mods.get('shift') and 8 or 0))
+
+_LUA_IDENT = re.compile(r'[A-Za-z_][A-Za-z0-9_]*\Z')
+_LUA_KEYWORDS = frozenset((
+    'and', 'break', 'do', 'else', 'elseif', 'end', 'false', 'for', 'function', 'goto', 'if',
+    'in', 'local', 'nil', 'not', 'or', 'repeat', 'return', 'then', 'true', 'until', 'while'))
+
+def _lua_str(s):
+    return '"' + s.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+def _lua_key(k):
+    if _LUA_IDENT.match(k) and k not in _LUA_KEYWORDS:
+        return k
+    return '[' + _lua_str(k) + ']'
+
+def _lua_emit(val, indent=0, out=None):
+    """Render val (dict/list/tuple/str/bool/number/None) as a Lua table literal.
+    Containers holding dicts are laid out one entry per line; everything else is inline."""
+    top = out is None
+    if top:
+        out = []
+    if isinstance(val, dict):
+        if any(isinstance(v, dict) for v in val.values()):
+            pad = ' ' * (indent + 4)
+            last = len(val) - 1
+            out.append('{\n')
+            for i, (k, v) in enumerate(val.items()):
+                out.append(pad + _lua_key(k) + ' = ')
+                _lua_emit(v, indent + 4, out)
+                out.append(',\n' if i < last else '\n')
+            out.append(' ' * indent + '}')
+        else:
+            out.append('{')
+            for i, (k, v) in enumerate(val.items()):
+                if i:
+                    out.append(', ')
+                out.append(_lua_key(k) + '=')
+                _lua_emit(v, indent, out)
+            out.append('}')
+    elif isinstance(val, (list, tuple)):
+        if any(isinstance(v, dict) for v in val):
+            pad = ' ' * (indent + 4)
+            last = len(val) - 1
+            out.append('{\n')
+            for i, v in enumerate(val):
+                out.append(pad)
+                _lua_emit(v, indent + 4, out)
+                out.append(',\n' if i < last else '\n')
+            out.append(' ' * indent + '}')
+        else:
+            out.append('{')
+            for i, v in enumerate(val):
+                if i:
+                    out.append(',')
+                _lua_emit(v, indent, out)
+            out.append('}')
+    elif isinstance(val, str):
+        out.append(_lua_str(val))
+    elif isinstance(val, bool):
+        out.append('true' if val else 'false')
+    elif val is None:
+        out.append('nil')
+    else:
+        out.append(repr(val))
+    if top:
+        return ''.join(out)
+
 # Output report for lightbar and rumble (USB, report ID 0x05, 32 bytes)
 def set_lightbar_and_rumble(h, r, g, b, left_rumble=0, right_rumble=0):
     report = [0x05, 0xFF, 0x04, 0x00, left_rumble, right_rumble, r, g, b] + [0]*23
@@ -61,6 +196,13 @@ class MappingConfigFrame(tk.Frame):
         'dpad_left': (124, 100),
         'dpad_right': (195, 99)
     }
+    # Button names and (N, 2) base coordinates, for scaling all positions in one step
+    _BTN_KEYS = list(BUTTONS)
+    _BTN_XY = np.array(list(BUTTONS.values()), dtype=np.int32)
+    # Key classes used when migrating old flat mapping files
+    _BUTTON_KEYS = frozenset(BUTTONS)
+    # Modifier flag -> key label prefix, in display order
+    _MOD_LABELS = (('ctrl', 'Ctrl'), ('opt', 'Opt'), ('shift', 'Shift'), ('cmd', 'Cmd'))
     BUTTON_LABELS = {
         'square': '□', 'cross': '×', 'circle': '○', 'triangle': '△',
         'l1': 'L1', 'r1': 'R1', 'l2': 'L2', 'r2': 'R2',
@@ -71,16 +213,28 @@ class MappingConfigFrame(tk.Frame):
     MAPPING_FILE = os.path.join(os.path.dirname(__file__), "../ds4_mapping.json")
     EXPORT_LUA_FILE = "/Users/alex/.hammerspoon/controller.lua"
     PS4_IMAGE = os.path.join(os.path.dirname(__file__), "../assets/ps4.png")
+    # Rescaled controller image and button positions, keyed by (toplevel, path, mtime, scale).
+    # A PhotoImage belongs to one Tk interpreter, so entries are never shared across roots.
+    _IMG_CACHE = {}
 
     def __init__(self, parent):
         super().__init__(parent)
+        self._dirty = False  # Set when self.mappings changes; save_mappings skips clean state
+        self._last_save_digest = None    # blake2b of the last mappings JSON written
+        self._last_export_digest = None  # blake2b of the last controller.lua written
         self.mappings = self.load_mappings()
         self.active_profile_name = "Default"  # Keep track of the selected profile
         self.button_widgets = {}
         self.key_labels = {}
+        self._last_state = {}  # btn -> (bg, key_text) last applied by update_button_colors
+        self._listbox_cache = []  # Profile names currently shown in profile_listbox, in order
+        # Debounced background Lua export (see _schedule_export)
+        self._export_timer = None
+        self._export_lock = threading.Lock()
+        self._export_results = queue.Queue()
+        self._key_capture_active = False
         self.create_visual_ui()
         self.populate_profile_listbox()  # Populate the list on startup
-        self.update_button_colors()
 
     def create_visual_ui(self):
         # Create the main two-column layout
@@ -111,30 +265,44 @@ class MappingConfigFrame(tk.Frame):
 
         # Load and display controller image with scaling
         try:
-            img = Image.open(self.PS4_IMAGE).convert('RGBA')
-            bg = Image.new('RGBA', img.size, (255,255,255,255))
-            img = Image.alpha_composite(bg, img)
-            
             # Scale the image to fit the larger canvas (approximately 1.5x scale)
             scale_factor = 1.5
-            new_width = int(img.width * scale_factor)
-            new_height = int(img.height * scale_factor)
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            toplevel = self.winfo_toplevel()
+            cache_key = (toplevel, self.PS4_IMAGE, os.path.getmtime(self.PS4_IMAGE), scale_factor)
+            cached = MappingConfigFrame._IMG_CACHE.get(cache_key)
+            if cached is None:
+                # Drop images of other (possibly destroyed) toplevels so they can be freed
+                MappingConfigFrame._IMG_CACHE = {
+                    k: v for k, v in MappingConfigFrame._IMG_CACHE.items() if k[0] is toplevel
+                }
+                img = Image.open(self.PS4_IMAGE).convert('RGBA')
+                bg = Image.new('RGBA', img.size, (255,255,255,255))
+                img = Image.alpha_composite(bg, img)
+                
+                new_width = int(img.width * scale_factor)
+                new_height = int(img.height * scale_factor)
+                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                photo = ImageTk.PhotoImage(img)
+                # Tk holds its own copy of the pixels; drop the PIL intermediates now
+                del img, bg
+                gc.collect()
+                
+                # Center the image in the canvas
+                canvas_width = 950
+                canvas_height = 700
+                img_x = (canvas_width - new_width) // 2
+                img_y = (canvas_height - new_height) // 2
+                
+                # Scale button positions to match the resized image
+                pts = (self._BTN_XY * scale_factor).astype(np.int32) + np.array([img_x, img_y], np.int32)
+                scaled_buttons = dict(zip(self._BTN_KEYS, map(tuple, pts.tolist())))
+                
+                cached = (photo, img_x, img_y, scaled_buttons)
+                MappingConfigFrame._IMG_CACHE[cache_key] = cached
             
-            self.ps4_img = ImageTk.PhotoImage(img)
-            # Center the image in the canvas
-            canvas_width = 950
-            canvas_height = 700
-            img_x = (canvas_width - new_width) // 2
-            img_y = (canvas_height - new_height) // 2
+            self.ps4_img, img_x, img_y, scaled_buttons = cached
             self.canvas.create_image(img_x, img_y, anchor='nw', image=self.ps4_img)
-            
-            # Scale button positions to match the resized image
-            self.scaled_buttons = {}
-            for btn, (x, y) in self.BUTTONS.items():
-                scaled_x = img_x + int(x * scale_factor)
-                scaled_y = img_y + int(y * scale_factor)
-                self.scaled_buttons[btn] = (scaled_x, scaled_y)
+            self.scaled_buttons = dict(scaled_buttons)
                 
         except Exception as e:
             self.ps4_img = None
@@ -142,7 +310,9 @@ class MappingConfigFrame(tk.Frame):
             # Fallback button positions for when image is not found
             self.scaled_buttons = self.BUTTONS.copy()
         
-        # Overlay buttons using scaled positions
+        # Overlay buttons using scaled positions. All windows are created in one pass
+        # and laid out together afterwards instead of colouring each one as it is placed.
+        self._overlay_window_ids = []
         for btn, (x, y) in self.scaled_buttons.items():
             w = Button(
                 self,
@@ -158,7 +328,7 @@ class MappingConfigFrame(tk.Frame):
                 borderwidth=0
             )
             self.button_widgets[btn] = w
-            self.canvas.create_window(x, y, window=w)
+            self._overlay_window_ids.append(self.canvas.create_window(x, y, window=w))
 
             # Bind single and double click events
             w.bind('<Button-1>', lambda e, b=btn: self.start_key_capture(b))
@@ -177,7 +347,7 @@ class MappingConfigFrame(tk.Frame):
             )
             self.key_labels[btn] = key_label
             # Position label directly below the button (no gap), set width to 40px
-            self.canvas.create_window(x, y + 22, window=key_label, width=50)
+            self._overlay_window_ids.append(self.canvas.create_window(x, y + 22, window=key_label, width=50))
         
         # Save & Export button - positioned in bottom right
         self.save_btn = Button(self, text="Save & Export", command=self.save_and_export, bg="#808080", fg="white", font=("Arial", 12, "bold"), activebackground="#808080", activeforeground="white", highlightthickness=0, borderwidth=0)
@@ -187,6 +357,10 @@ class MappingConfigFrame(tk.Frame):
         self.info_label = tk.Label(self, text="Click a button to map. Green = mapped, gray = unmapped.", font=("Arial", 10, "bold"), fg="black", bg="white")
         self.canvas.create_window(475, 680, window=self.info_label)
 
+        # Single layout pass for everything above, then apply mapping colours once
+        self.update_idletasks()
+        self.update_button_colors()
+
     def edit_mapping(self, btn):
         active_profile = self.active_profile_name if hasattr(self, 'active_profile_name') else 'Default'
         if active_profile not in self.mappings:
@@ -246,6 +420,7 @@ class MappingConfigFrame(tk.Frame):
                 'modifiers': {k: mods[k].get() for k in mods},
                 'key': key_var.get()
             }
+            self._dirty = True
             self.update_button_colors()
             self.save_mappings()
             top.destroy()
@@ -255,6 +430,7 @@ class MappingConfigFrame(tk.Frame):
         def unmap():
             if section in self.mappings[active_profile] and mapping_key in self.mappings[active_profile][section]:
                 del self.mappings[active_profile][section][mapping_key]
+                self._dirty = True
                 self.update_button_colors()
                 self.save_mappings()
             top.destroy()
@@ -277,40 +453,43 @@ class MappingConfigFrame(tk.Frame):
             
             if mapping and mapping.get('key'):
                 # Button is mapped
-                w.config(bg="#4CAF50", activebackground="#4CAF50")  # Green
-                # Update key label
-                key_label = self.key_labels[btn]
+                bg = "#4CAF50"  # Green
                 key_text = mapping.get('key', '')
                 # Add modifier indicators
                 mods = mapping.get('modifiers', {})
-                mod_indicators = []
-                if mods.get('ctrl'): mod_indicators.append('Ctrl')
-                if mods.get('opt'): mod_indicators.append('Opt')
-                if mods.get('shift'): mod_indicators.append('Shift')
-                if mods.get('cmd'): mod_indicators.append('Cmd')
-                if mod_indicators:
-                    key_text = '+'.join(mod_indicators) + '+' + key_text
+                parts = [label for flag, label in self._MOD_LABELS if mods.get(flag)]
+                if parts:
+                    parts.append(key_text)
+                    key_text = '+'.join(parts)
                 # Truncate if too long
                 if len(key_text) > 8:
                     key_text = key_text[:6] + '..'
-                key_label.config(text=key_text, fg="white", bg="#4CAF50")
             else:
                 # Button is not mapped
-                w.config(bg="#808080", activebackground="#808080")  # Gray
-                # Clear key label
-                key_label = self.key_labels[btn]
-                key_label.config(text="", fg="white", bg="#808080")
+                bg = "#808080"  # Gray
+                key_text = ""
+            
+            # Skip the Tk reconfigure if this button already shows the same state
+            new_state = (bg, key_text)
+            if self._last_state.get(btn) == new_state:
+                continue
+            w.config(bg=bg, activebackground=bg)
+            self.key_labels[btn].config(text=key_text, fg="white", bg=bg)
+            self._last_state[btn] = new_state
 
     def migrate_mappings_structure(self, old_mappings):
         """Migrate old flat mapping structure to new nested structure"""
+        # Nothing to do if every profile already has the nested structure
+        if all(isinstance(v, dict) and ('buttons' in v or 'dpad' in v) for v in old_mappings.values()):
+            return old_mappings
+        
         new_mappings = {}
+        button_keys = self._BUTTON_KEYS
         
         # Check if this is the old structure where button names are at the top level
-        has_top_level_buttons = False
-        for key in old_mappings.keys():
-            if key in self.BUTTONS or key.startswith('dpad_'):
-                has_top_level_buttons = True
-                break
+        # (any 'dpad_*' key counts, not just the four named directions)
+        has_top_level_buttons = (not button_keys.isdisjoint(old_mappings)
+                                 or any(key.startswith('dpad_') for key in old_mappings))
         
         if has_top_level_buttons:
             # This is the old structure with button names at the top level
@@ -323,9 +502,8 @@ class MappingConfigFrame(tk.Frame):
             for key, mapping in old_mappings.items():
                 if key.startswith('dpad_'):
                     # Convert dpad_up -> up, dpad_down -> down, etc.
-                    direction = key.replace('dpad_', '')
-                    new_mappings["Default"]["dpad"][direction] = mapping
-                elif key in self.BUTTONS:
+                    new_mappings["Default"]["dpad"][key[5:]] = mapping
+                elif key in button_keys:
                     # Regular button
                     new_mappings["Default"]["buttons"][key] = mapping
                 elif isinstance(mapping, dict) and ("buttons" in mapping or "dpad" in mapping):
@@ -353,8 +531,7 @@ class MappingConfigFrame(tk.Frame):
                     for key, mapping in profile_data.items():
                         if key.startswith('dpad_'):
                             # Convert dpad_up -> up, dpad_down -> down, etc.
-                            direction = key.replace('dpad_', '')
-                            new_mappings[profile_name]["dpad"][direction] = mapping
+                            new_mappings[profile_name]["dpad"][key[5:]] = mapping
                         else:
                             # Regular button
                             new_mappings[profile_name]["buttons"][key] = mapping
@@ -365,8 +542,9 @@ class MappingConfigFrame(tk.Frame):
         """Load mappings from JSON file with structure migration"""
         try:
             if os.path.exists(self.MAPPING_FILE):
-                with open(self.MAPPING_FILE, 'r') as f:
-                    mappings = json.load(f)
+                with open(self.MAPPING_FILE, 'rb') as f:
+                    raw = f.read()
+                mappings = orjson.loads(raw) if orjson else json.loads(raw)
                 
                 # Check if migration is needed (old flat structure)
                 needs_migration = False
@@ -394,22 +572,66 @@ class MappingConfigFrame(tk.Frame):
     def save_mappings_to_file(self, mappings):
         """Save mappings to JSON file"""
         try:
-            with open(self.MAPPING_FILE, 'w') as f:
-                json.dump(mappings, f, indent=2)
+            if orjson:
+                data = orjson.dumps(mappings, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(mappings, indent=2).encode('utf-8')
+            # Re-saving identical content (e.g. the same key mapped again) skips the write
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            if digest == self._last_save_digest:
+                return True
+            with open(self.MAPPING_FILE, 'wb') as f:
+                f.write(data)
+            self._last_save_digest = digest
+            return True
         except Exception as e:
             print(f"Error saving mappings: {e}")
+            return False
 
     def save_mappings(self):
-        """Save current mappings to file"""
-        self.save_mappings_to_file(self.mappings)
+        """Save current mappings to file (no-op if nothing changed since the last save)"""
+        if not self._dirty:
+            return
+        if self.save_mappings_to_file(self.mappings):
+            self._dirty = False
 
     def save_and_export(self):
-        """Save mappings and export to Lua, then reload Hammerspoon using CLI"""
+        """Save mappings, then export to Lua and reload Hammerspoon in the background"""
         self.save_mappings()
-        self.export_to_lua()
+        self.info_label.config(text="Exporting mappings...", fg="#1976D2")
+        self._schedule_export()
+
+    def _schedule_export(self):
+        """Debounce exports: rapid requests collapse into one write 300 ms after the last one"""
+        if self._export_timer:
+            self.after_cancel(self._export_timer)
+        self._export_timer = self.after(300, self._do_export_bg)
+
+    def _do_export_bg(self):
+        """Snapshot the mappings on the Tk thread and hand the emit + write to a worker"""
+        self._export_timer = None
+        snapshot = self.lua_mappings()  # Freshly built dicts; the worker never touches self.mappings
+        threading.Thread(target=self._export_worker, args=(snapshot,), daemon=True).start()
+        self.after(100, self._check_export_done)
+
+    def _export_worker(self, snapshot):
+        # Serialize writers so two exports never interleave on the same file
+        with self._export_lock:
+            exported = self._export_impl(snapshot)
+            reloaded = exported and self.reload_hammerspoon_config()
+        self._export_results.put((exported, reloaded))
+
+    def _check_export_done(self):
+        """Report a finished background export on the main thread"""
+        try:
+            exported, reloaded = self._export_results.get_nowait()
+        except queue.Empty:
+            self.after(100, self._check_export_done)
+            return
         
-        # Try to reload using Hammerspoon CLI
-        if self.reload_hammerspoon_config():
+        if not exported:
+            self.info_label.config(text="Export failed - see console for details.", fg="#D32F2F")
+        elif reloaded:
             print("✅ Export completed! Hammerspoon reloaded via CLI.")
             self.info_label.config(text="Mappings saved and exported! Hammerspoon reloaded.", fg="#4CAF50")
         else:
@@ -449,13 +671,46 @@ class MappingConfigFrame(tk.Frame):
             print(f"⚠️  Error with CLI reload: {e}")
             return False
 
+    @staticmethod
+    def _lua_entry(mapping):
+        """One mapping as exported to Lua, with its log description ("cmd-alt-x") built here once"""
+        modifiers = MODS_LUA_NAMES[mods_to_bits(mapping.get('modifiers', {}))]
+        key = mapping['key']
+        return {'modifiers': modifiers, 'key': key, 'keydesc': '-'.join(modifiers + (key.lower(),))}
+
+    def lua_mappings(self):
+        """Profiles reduced to what the Lua side needs: mapped entries only, modifiers as Hammerspoon names"""
+        lua = {}
+        for profile_name, profile_data in self.mappings.items():
+            if not isinstance(profile_data, dict) or "buttons" not in profile_data:
+                continue
+            # Buttons are scanned on every packet, so they go out as an array (ipairs-style
+            # numeric loop in Lua); d-pad entries are looked up by direction and stay keyed.
+            lua[profile_name] = {
+                "buttons": [
+                    dict(self._lua_entry(mapping), name=name)
+                    for name, mapping in profile_data.get("buttons", {}).items() if mapping.get('key')
+                ],
+                "dpad": {
+                    name: self._lua_entry(mapping)
+                    for name, mapping in profile_data.get("dpad", {}).items() if mapping.get('key')
+                },
+            }
+        return lua
+
     def export_to_lua(self):
+        """Export the current mappings to the Hammerspoon controller file (blocking)"""
+        with self._export_lock:
+            return self._export_impl(self.lua_mappings())
+
+    def _export_impl(self, lua_maps):
+        """Write controller.lua for lua_maps; returns True on success. Safe to run off the Tk thread."""
         try:
-            # Create the complete controller.lua file content
-            lua_content = '''-- Hammerspoon Controller Mapper
+            # Create the complete controller.lua file content; fragments are
+            # collected in a list and joined once at the end
+            parts = ['''-- Hammerspoon Controller Mapper
 -- Receives DS4 data from Python script via UDP and maps it to key presses.
 
-local json = require("hs.json")
 local eventtap = require("hs.eventtap")
 
 local controller = {}
@@ -463,73 +718,9 @@ local controller = {}
 -- ##################################################################
 -- MAPPINGS GENERATED BY DS4 MAPPING UI
 -- ##################################################################
-controller.mappings = {
-'''
-            
-            def lua_table_block(items, indent=0):
-                """Helper to format a Lua table block with commas between items, but not after the last one"""
-                lines = []
-                for i, (k, v) in enumerate(items):
-                    comma = ',' if i < len(items) - 1 else ''
-                    lines.append(' ' * indent + f'{k} = {v}{comma}')
-                return '\n'.join(lines)
-            
-            # Add mappings
-            profile_names = [k for k in self.mappings.keys() if isinstance(self.mappings[k], dict) and "buttons" in self.mappings[k]]
-            for pi, profile_name in enumerate(profile_names):
-                profile_data = self.mappings[profile_name]
-                lua_content += f'    ["{profile_name}"] = {{\n'
-                
-                # Buttons
-                button_items = []
-                for btn, mapping in profile_data.get("buttons", {}).items():
-                    key = mapping.get('key', '')
-                    if key:
-                        mods = mapping.get('modifiers', {})
-                        # Convert 'opt' to 'alt' for Hammerspoon compatibility
-                        modlist = []
-                        for mod in ['cmd','ctrl','opt','shift']:
-                            if mods.get(mod):
-                                # Convert 'opt' to 'alt' for Hammerspoon
-                                lua_mod = 'alt' if mod == 'opt' else mod
-                                modlist.append(lua_mod)
-                        mods_lua = '{' + ','.join(f'"{mod}"' for mod in modlist) + '}'
-                        button_items.append((btn, f'{{modifiers={mods_lua}, key="{key}"}}'))
-                
-                lua_content += '        buttons = {\n'
-                lua_content += lua_table_block(button_items, indent=12)
-                if button_items:
-                    lua_content += '\n'
-                lua_content += '        },\n'
-                
-                # Dpad
-                dpad_items = []
-                for direction, mapping in profile_data.get("dpad", {}).items():
-                    key = mapping.get('key', '')
-                    if key:
-                        mods = mapping.get('modifiers', {})
-                        # Convert 'opt' to 'alt' for Hammerspoon compatibility
-                        modlist = []
-                        for mod in ['cmd','ctrl','opt','shift']:
-                            if mods.get(mod):
-                                # Convert 'opt' to 'alt' for Hammerspoon
-                                lua_mod = 'alt' if mod == 'opt' else mod
-                                modlist.append(lua_mod)
-                        mods_lua = '{' + ','.join(f'"{mod}"' for mod in modlist) + '}'
-                        dpad_items.append((direction, f'{{modifiers={mods_lua}, key="{key}"}}'))
-                
-                lua_content += '        dpad = {\n'
-                lua_content += lua_table_block(dpad_items, indent=12)
-                if dpad_items:
-                    lua_content += '\n'
-                lua_content += '        }\n'
-                lua_content += '    }'
-                if pi < len(profile_names) - 1:
-                    lua_content += ',\n'
-                else:
-                    lua_content += '\n'
+controller.mappings = ''', _lua_emit(lua_maps)]
             
-            lua_content += '''}
+            parts.append('''
 
 -- ##################################################################
 
@@ -555,6 +746,31 @@ local function translateKey(key)
     end
 end
 
+-- Mappings are static once loaded, so each one gets its key-down/key-up events built
+-- here once; firing a mapping is then just two posts.
+local function buildFire(mapping)
+    local modifiers = mapping.modifiers or {}
+    local key = translateKey(mapping.key)
+    local ok, down, up = pcall(function()
+        return hs.eventtap.event.newKeyEvent(modifiers, key, true),
+               hs.eventtap.event.newKeyEvent(modifiers, key, false)
+    end)
+    if not ok then
+        -- Unknown key name: fall back to the slower lookup-per-press path
+        return function() hs.eventtap.keyStroke(modifiers, key) end
+    end
+    return function() down:post(); up:post() end
+end
+
+for _, profile in pairs(controller.mappings) do
+    for i = 1, #profile.buttons do
+        profile.buttons[i].fire = buildFire(profile.buttons[i])
+    end
+    for _, mapping in pairs(profile.dpad) do
+        mapping.fire = buildFire(mapping)
+    end
+end
+
 -- State tracking to prevent continuous key presses (profile-specific)
 local previousState = {
     buttons = {},  -- Will be profile-specific: buttons[profile][button]
@@ -566,92 +782,117 @@ local previousState = {
 local udpSocket = nil
 local UDP_PORT = 12345 -- Must match the port in your Python script
 
+-- Binary packet layout; must match _PACKET_FMT / _PACKET_BUTTONS in the Python UI
+local PACKET_FMT = "''' + _PACKET_FMT + '''"
+local PACKET_SIZE = ''' + str(_PACKET.size) + '''
+local BUTTON_BITS = { ''' + ', '.join(f'{name} = {i}' for i, name in enumerate(_PACKET_BUTTONS)) + ''' }
+local DPAD_NAMES = { [0] = "up", "ne", "right", "se", "down", "sw", "left", "nw", "none" }
+
+-- Event buffer reused across packets: n_events is reset per packet and slots are
+-- cleared as they are consumed, so the common no-event packet allocates nothing
+local events, n_events = {}, 0
+
+local dpadToDirection = {
+    ["up"] = "up", ["down"] = "down", ["left"] = "left", ["right"] = "right",
+    ["ne"] = "ne", ["se"] = "se", ["sw"] = "sw", ["nw"] = "nw"
+}
+
+-- Frontmost application name, re-queried at most every 200 ms instead of on every packet
+local cachedAppName, cachedAt = "Default", 0
+local function getAppName()
+    local now = hs.timer.secondsSinceEpoch()
+    if now - cachedAt > 0.2 then
+        local activeApp = hs.application.frontmostApplication()
+        cachedAppName = activeApp and activeApp:name() or "Default"
+        cachedAt = now
+    end
+    return cachedAppName
+end
+
 -- ## Core Mapping Logic ## --
 
 function controller.processData(data)
-    local status, decoded = pcall(json.decode, data)
-    if not status then
+    -- Fixed-size binary packet: a length check replaces a protected decode per packet
+    if #data ~= PACKET_SIZE then
         return
     end
+    local buttonBits, dpadCode = string.unpack(PACKET_FMT, data)
 
-    -- Get the active application name for profile selection
-    local activeApp = hs.application.frontmostApplication()
-    local appName = activeApp and activeApp:name() or "Default"
+    -- Get the active application name for profile selection (cached, see getAppName)
+    local appName = getAppName()
     
     -- Select the appropriate profile
     local profile = controller.mappings[appName] or controller.mappings["Default"] or {buttons = {}, dpad = {}}
     
-    -- Initialize profile-specific state tracking
-    if not previousState.buttons[appName] then
-        previousState.buttons[appName] = {}
+    -- Initialize profile-specific state tracking; the per-app tables are fetched once per
+    -- packet so the loops below do a single lookup per button
+    local bstate = previousState.buttons[appName]
+    if not bstate then
+        bstate = {}
+        previousState.buttons[appName] = bstate
     end
-    if not previousState.dpad[appName] then
-        previousState.dpad[appName] = {}
+    local dstate = previousState.dpad[appName]
+    if not dstate then
+        dstate = {}
+        previousState.dpad[appName] = dstate
     end
     
     -- TRUE EVENT-BASED PROCESSING
     -- Only process if there's an actual event (button press, d-pad change, stick movement)
     local hasEvent = false
-    local events = {}
+    n_events = 0
 
     -- 1. Check for button events (only process if buttons changed)
-    for button, mapping in pairs(profile.buttons) do
-        local isPressed = decoded.buttons[button]
-        local wasPressed = previousState.buttons[appName][button] or false
+    -- profile.buttons is an array of {name=..., modifiers=..., key=...} entries
+    local buttons = profile.buttons
+    for i = 1, #buttons do
+        local b = buttons[i]
+        local bit = BUTTON_BITS[b.name]
+        local isPressed = bit ~= nil and (buttonBits >> bit) & 1 == 1
+        local wasPressed = bstate[b.name] or false
 
         -- Rising edge detection (false -> true transition)
         if isPressed and not wasPressed then
             hasEvent = true
-            table.insert(events, {type = "button", button = button, mapping = mapping})
+            n_events = n_events + 1
+            events[n_events] = {type = "button", button = b.name, mapping = b}
         end
-        previousState.buttons[appName][button] = isPressed
+        bstate[b.name] = isPressed
     end
 
     -- 2. Check for D-Pad events (only process if d-pad changed)
-    local currentDpad = decoded.dpad
-    local previousDpad = previousState.dpad[appName].current or "none"
+    local currentDpad = DPAD_NAMES[dpadCode] or "none"
+    local previousDpad = dstate.current or "none"
 
     if currentDpad ~= previousDpad then
         hasEvent = true
-        local dpadToDirection = {
-            ["up"] = "up", ["down"] = "down", ["left"] = "left", ["right"] = "right",
-            ["ne"] = "ne", ["se"] = "se", ["sw"] = "sw", ["nw"] = "nw"
-        }
         -- Trigger on button RELEASE (when going from a direction back to "none")
         if currentDpad == "none" and previousDpad ~= "none" then
             local direction = dpadToDirection[previousDpad]
             if direction and profile.dpad[direction] then
-                table.insert(events, {type = "dpad", direction = direction, mapping = profile.dpad[direction]})
+                n_events = n_events + 1
+                events[n_events] = {type = "dpad", direction = direction, mapping = profile.dpad[direction]}
             end
         end
-        previousState.dpad[appName].current = currentDpad
+        dstate.current = currentDpad
     end
 
     -- 4. Process all events at once (only if there are events)
     if hasEvent then
-        for _, event in ipairs(events) do
-            local keydesc = ""
-            local modifiers = {}
-            local key = nil
-
-            -- Support new mapping format: {modifiers=..., key=...}
-            if event.mapping and type(event.mapping) == "table" and event.mapping.key then
-                modifiers = event.mapping.modifiers or {}
-                key = translateKey(event.mapping.key)  -- Translate the key
-                keydesc = (next(modifiers) and table.concat(modifiers, "-") .. "-" or "") .. key
-            else
-                key = translateKey(event.mapping or event.key)  -- Translate the key
-                keydesc = tostring(key)
-            end
+        for i = 1, n_events do
+            local event = events[i]
+            events[i] = nil
+            local mapping = event.mapping
 
+            -- keydesc is precomputed at export time; fire() is prebuilt by buildFire
             if event.type == "button" then
-                print("🎮 Button pressed: " .. event.button .. " -> Key: " .. keydesc)
+                print("🎮 Button pressed: " .. event.button .. " -> Key: " .. mapping.keydesc)
             elseif event.type == "dpad" then
-                print("🎮 D-pad pressed: " .. event.direction .. " -> Key: " .. keydesc)
+                print("🎮 D-pad pressed: " .. event.direction .. " -> Key: " .. mapping.keydesc)
             end
 
             -- Send the key event
-            hs.eventtap.keyStroke(modifiers, key)
+            mapping.fire()
         end
     end
 end
@@ -694,48 +935,29 @@ end
 controller:start()
 
 return controller
-'''
+''')
+            data = "".join(parts).encode('utf-8')
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            if digest == self._last_export_digest:
+                print("Hammerspoon controller file already up to date")
+                return True
             
-            # Write the complete file
-            with open(self.EXPORT_LUA_FILE, 'w') as f:
-                f.write(lua_content)
+            # Write the complete file: one binary write, no text-layer newline translation.
+            # Written to a temp file and swapped in so the Hammerspoon watcher never sees a partial file.
+            tmp_path = self.EXPORT_LUA_FILE + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.EXPORT_LUA_FILE)
+            self._last_export_digest = digest
             
             print(f"Updated Hammerspoon controller file: {self.EXPORT_LUA_FILE}")
+            return True
             
         except Exception as e:
+            # The write goes through a temp file + os.replace, so a failure leaves the
+            # previous controller.lua intact; no separate backup file is needed
             print(f"Error exporting to Lua: {e}")
-            try:
-                # Create backup file with new structure
-                with open("controller_mapping_backup.lua", 'w') as f:
-                    f.write('-- Auto-generated DS4 to key mapping (new structure)\n')
-                    f.write('controller.mappings = {\n')
-                    for profile_name, profile_data in self.mappings.items():
-                        if not isinstance(profile_data, dict) or "buttons" not in profile_data:
-                            continue
-                        f.write(f'    ["{profile_name}"] = {{\n')
-                        f.write('        buttons = {\n')
-                        for btn, mapping in profile_data.get("buttons", {}).items():
-                            key = mapping.get('key', '')
-                            if key:
-                                mods = mapping.get('modifiers', {})
-                                modlist = [mod for mod in ['cmd','ctrl','alt','shift'] if mods.get(mod)]
-                                mods_lua = '{' + ','.join(f'"{mod}"' for mod in modlist) + '}'
-                                f.write(f'            {btn} = {{modifiers={mods_lua}, key="{key}"}},\n')
-                        f.write('        },\n')
-                        f.write('        dpad = {\n')
-                        for direction, mapping in profile_data.get("dpad", {}).items():
-                            key = mapping.get('key', '')
-                            if key:
-                                mods = mapping.get('modifiers', {})
-                                modlist = [mod for mod in ['cmd','ctrl','alt','shift'] if mods.get(mod)]
-                                mods_lua = '{' + ','.join(f'"{mod}"' for mod in modlist) + '}'
-                                f.write(f'            {direction} = {{modifiers={mods_lua}, key="{key}"}},\n')
-                        f.write('        },\n')
-                        f.write('    },\n')
-                    f.write('}\n')
-                print("Created backup mapping file: controller_mapping_backup.lua")
-            except Exception as e2:
-                print(f"Error creating backup: {e2}")
+            return False
 
     # --- Add these new methods inside the MappingConfigFrame class ---
     def start_key_capture(self, btn):
@@ -748,76 +970,45 @@ return controller
         self._captured_key = None
         self._key_capture_btn = btn
         self.info_label.config(text=f"Press a key combination for '{self.BUTTON_LABELS[btn]}'... (Press Esc to cancel)", fg="#1976D2")
-        # Bind events to the root window to capture keys globally
+        # Keys arrive through the global handlers bound once by DS4ControlUI
         self.winfo_toplevel().focus_set()
-        self.winfo_toplevel().bind_all('<KeyPress>', self._on_key_press)
-        self.winfo_toplevel().bind_all('<KeyRelease>', self._on_key_release)
         # Store the active profile at the time of capture
         self._key_capture_profile = self.active_profile_name if hasattr(self, 'active_profile_name') else 'Default'
 
+    def _on_key_press_maybe(self, event):
+        """Global <KeyPress> handler; ignored unless a key capture is in progress."""
+        if not self._key_capture_active:
+            return
+        self._on_key_press(event)
+
+    def _on_key_release_maybe(self, event):
+        """Global <KeyRelease> handler; ignored unless a key capture is in progress."""
+        if not self._key_capture_active:
+            return
+        self._on_key_release(event)
+
     def _on_key_press(self, event):
         """Handles key press events during capture mode."""
-        # Map macOS modifier keys properly
-        if event.keysym in ('Control_L', 'Control_R'):
-            self._captured_mods['ctrl'] = True
-        elif event.keysym in ('Option_L', 'Option_R', 'Alt_L', 'Alt_R'):
-            self._captured_mods['opt'] = True  # Use 'opt' for macOS Option key
-        elif event.keysym in ('Shift_L', 'Shift_R'):
-            self._captured_mods['shift'] = True
-        elif event.keysym in ('Meta_L', 'Meta_R', 'Command', 'Command_L', 'Command_R'):
-            self._captured_mods['cmd'] = True
-        elif event.keysym == 'Escape':
+        keysym = event.keysym
+        # Map macOS modifier keys properly ('opt' for the Option key)
+        mod = _MOD_KEYSYMS.get(keysym)
+        if mod:
+            self._captured_mods[mod] = True
+            return
+        if keysym == 'Escape':
             self._cancel_key_capture()
+            return
+        
+        keysym_lower = keysym.lower()
+        if self._captured_mods['opt']:
+            # When Option is held macOS reports the produced character; map it back to
+            # the base key. Single letters/digits and unmapped keysyms are used as-is.
+            self._captured_key = _OPTION_KEY_MAP.get(keysym_lower, keysym if keysym.isdigit() else keysym_lower)
         else:
-            # Only set the key if it's not a pure modifier
-            if event.keysym not in ('Control_L', 'Control_R', 'Option_L', 'Option_R', 'Alt_L', 'Alt_R', 'Shift_L', 'Shift_R', 'Meta_L', 'Meta_R', 'Command', 'Command_L', 'Command_R'):
-                # Handle Option key combinations properly
-                if self._captured_mods.get('opt', False):
-                    # When Option is held, we need to get the base key
-                    # Use a mapping approach since keycode ranges might vary on macOS
-                    
-                    # Direct mapping for common Option+key combinations that produce special chars
-                    option_key_map = {
-                        'ssharp': 's',           # Option+S
-                        'partialderivative': 'd', # Option+D  
-                        'integral': 'b',         # Option+B
-                        'mu': 'm',               # Option+M
-                        'dead_acute': 'e',       # Option+E
-                        'registered': 'r',       # Option+R
-                        'trademark': '2',        # Option+2
-                        'cent': '4',             # Option+4
-                        'infinity': '5',         # Option+5
-                        'section': '6',          # Option+6
-                        'paragraph': '7',        # Option+7
-                        'bullet': '8',           # Option+8
-                        'ordfeminine': '9',      # Option+9
-                        'masculine': '0',        # Option+0
-                        'ae': "'",               # Option+'
-                        'oe': 'q',               # Option+Q
-                        'sum': 'w',              # Option+W
-                        'dead_grave': '`',       # Option+`
-                        'asciitilde': 'n',       # Option+N
-                        'guillemotleft': '\\',   # Option+\
-                        'guillemotright': '|',   # Option+|
-                    }
-                    
-                    keysym_lower = event.keysym.lower()
-                    if keysym_lower in option_key_map:
-                        self._captured_key = option_key_map[keysym_lower]
-                    elif len(event.keysym) == 1 and event.keysym.isalpha():
-                        # Single letter, use directly
-                        self._captured_key = event.keysym.lower()
-                    elif len(event.keysym) == 1 and event.keysym.isdigit():
-                        # Single digit, use directly
-                        self._captured_key = event.keysym
-                    else:
-                        # For unmapped special characters, just use the keysym
-                        self._captured_key = event.keysym.lower()
-                else:
-                    # No Option key, use keysym directly
-                    self._captured_key = event.keysym.lower()
-                
-                self._finish_key_capture()
+            # No Option key, use keysym directly
+            self._captured_key = keysym_lower
+        
+        self._finish_key_capture()
 
     def _on_key_release(self, event):
         """Handles key release events during capture mode."""
@@ -849,6 +1040,7 @@ return controller
             'modifiers': self._captured_mods.copy(),
             'key': self._captured_key
         }
+        self._dirty = True
         self.info_label.config(text=f"Mapped '{self.BUTTON_LABELS[btn]}' to a new key!", fg="#388E3C")
         self.update_button_colors()
         self.save_mappings()
@@ -863,8 +1055,6 @@ return controller
         """Unbinds events and resets state after capture is finished or cancelled."""
         if hasattr(self, '_key_capture_active') and self._key_capture_active:
             self._key_capture_active = False
-            self.winfo_toplevel().unbind_all('<KeyPress>')
-            self.winfo_toplevel().unbind_all('<KeyRelease>')
             self.after(2000, lambda: self.info_label.config(text="Click a button to map. Double-click to edit.", fg="black"))
 
     def add_profile(self):
@@ -900,6 +1090,7 @@ return controller
                 messagebox.showerror("Error", f"Profile '{name}' already exists.", parent=dialog)
                 return
             self.mappings[name] = {"buttons": {}, "dpad": {}}
+            self._dirty = True
             self.active_profile_name = name
             self.populate_profile_listbox() # Refresh the list
             self.update_button_colors()
@@ -920,19 +1111,40 @@ return controller
             return
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete the '{profile_to_delete}' profile?"):
             del self.mappings[profile_to_delete]
+            self._dirty = True
             self.active_profile_name = "Default" # Fallback to Default
             self.populate_profile_listbox() # Refresh the list
             self.update_button_colors()
             print(f"Profile '{profile_to_delete}' deleted.")
 
+    @staticmethod
+    def _profile_sort_key(name):
+        # "Default" always first, then case-insensitive; the name itself breaks ties
+        return (name != 'Default', name.lower(), name)
+
     def populate_profile_listbox(self):
-        """Clears and redraws the list of profiles in the side panel listbox."""
-        self.profile_listbox.delete(0, tk.END)
-        # Ensure "Default" is always first
-        profiles = sorted(self.mappings.keys(), key=lambda p: (p != 'Default', p.lower()))
-        for profile_name in profiles:
-            self.profile_listbox.insert(tk.END, profile_name)
+        """Brings the side panel listbox in line with the profiles, touching only changed rows."""
+        profiles = sorted(self.mappings.keys(), key=self._profile_sort_key)
+        old = self._listbox_cache
+        if profiles != old:
+            # Both lists share one ordering, so a single merge pass finds the changed rows
+            sort_key = self._profile_sort_key
+            pos = oi = 0
+            for profile_name in profiles:
+                new_key = sort_key(profile_name)
+                while oi < len(old) and sort_key(old[oi]) < new_key:
+                    self.profile_listbox.delete(pos)  # Removed profile
+                    oi += 1
+                if oi < len(old) and old[oi] == profile_name:
+                    oi += 1  # Unchanged row
+                else:
+                    self.profile_listbox.insert(pos, profile_name)
+                pos += 1
+            if oi < len(old):
+                self.profile_listbox.delete(pos, tk.END)
+            self._listbox_cache = profiles
         # Reselect the currently active profile
+        self.profile_listbox.selection_clear(0, tk.END)
         if self.active_profile_name in profiles:
             idx = profiles.index(self.active_profile_name)
             self.profile_listbox.selection_set(idx)
@@ -979,18 +1191,31 @@ class DS4ControlUI(tk.Tk):
         # --- Main Thread Polling Support ---
         self.text_update_counter = 0
         self.is_running = True
+        # HID reads block on a daemon thread; the Tk poll only consumes the newest report
+        self._hid_queue = collections.deque(maxlen=1)
+        self._hid_error = None
+        self._hid_thread = threading.Thread(target=self._hid_reader_loop, daemon=True)
+        self._hid_thread.start()
         # -------------------------
         
         # --- UDP Socket Setup for Hammerspoon Communication ---
         self.udp_host = '127.0.0.1'  # Localhost
         self.udp_port = 12345        # Port for Hammerspoon to listen on
+        self.udp_addr = (self.udp_host, self.udp_port)
+        self._last_packet = b''  # Last packet sent; unchanged state is not re-sent
         self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Loopback-only peer: connect once so each send skips address resolution and the
+        # route lookup, and never block the Tk thread if the send buffer is full
+        self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 16)
+        self.udp_socket.connect(self.udp_addr)
+        self.udp_socket.setblocking(False)
         print(f"Broadcasting controller data to UDP {self.udp_host}:{self.udp_port}")
         # -----------------------------------------------------
         
         # --- Optimization Support ---
         self.text_update_counter = 0
         self.last_poll_time = 0
+        self._slider_timers = {}  # Pending debounced slider callbacks, keyed by slider
         # ---------------------------
         
         # Load settings from file
@@ -1008,6 +1233,11 @@ class DS4ControlUI(tk.Tk):
         
         self.create_widgets()
         
+        # Key capture for the mapping tab: bound once here and gated on its
+        # _key_capture_active flag instead of bind_all/unbind_all per capture
+        self.bind_all('<KeyPress>', self.mapping_config_frame._on_key_press_maybe)
+        self.bind_all('<KeyRelease>', self.mapping_config_frame._on_key_release_maybe)
+        
         # Bind the 'c' key to set custom neutral position
         self.bind('<c>', self.set_neutral_orientation)
         
@@ -1091,7 +1321,7 @@ class DS4ControlUI(tk.Tk):
         tk.Label(alpha_frame, text="Filter Responsiveness (Alpha):").pack(anchor='w')
         self.alpha_slider = tk.Scale(alpha_frame, from_=0.80, to=0.98, resolution=0.01, 
                                    orient=tk.HORIZONTAL, variable=tk.DoubleVar(value=self.alpha),
-                                   command=self.update_alpha)
+                                   command=self._debounced('alpha', self.update_alpha))
         self.alpha_slider.pack(fill='x')
         self.alpha_label = tk.Label(alpha_frame, text=f"Current: {self.alpha:.2f} (Higher = Smoother, Lower = More Responsive)")
         self.alpha_label.pack(anchor='w')
@@ -1102,7 +1332,7 @@ class DS4ControlUI(tk.Tk):
         tk.Label(sensitivity_frame, text="Gyro Sensitivity:").pack(anchor='w')
         self.sensitivity_slider = tk.Scale(sensitivity_frame, from_=200, to=1000, resolution=10,
                                          orient=tk.HORIZONTAL, variable=tk.DoubleVar(value=self.gyro_sensitivity),
-                                         command=self.update_sensitivity)
+                                         command=self._debounced('sensitivity', self.update_sensitivity))
         self.sensitivity_slider.pack(fill='x')
         self.sensitivity_label = tk.Label(sensitivity_frame, text=f"Current: {self.gyro_sensitivity:.0f} (Lower = More Sensitive)")
         self.sensitivity_label.pack(anchor='w')
@@ -1113,7 +1343,7 @@ class DS4ControlUI(tk.Tk):
         tk.Label(damping_frame, text="Neutral Return Damping:").pack(anchor='w')
         self.damping_slider = tk.Scale(damping_frame, from_=0.90, to=0.99, resolution=0.01,
                                      orient=tk.HORIZONTAL, variable=tk.DoubleVar(value=self.damping_factor),
-                                     command=self.update_damping)
+                                     command=self._debounced('damping', self.update_damping))
         self.damping_slider.pack(fill='x')
         self.damping_label = tk.Label(damping_frame, text=f"Current: {self.damping_factor:.2f} (Higher = Slower Return to Neutral)")
         self.damping_label.pack(anchor='w')
@@ -1124,7 +1354,7 @@ class DS4ControlUI(tk.Tk):
         tk.Label(polling_frame, text="Polling Rate (ms):").pack(anchor='w')
         self.polling_slider = tk.Scale(polling_frame, from_=10, to=100, resolution=5,
                                      orient=tk.HORIZONTAL, variable=tk.IntVar(value=self.polling_rate),
-                                     command=self.update_polling)
+                                     command=self._debounced('polling', self.update_polling))
         self.polling_slider.pack(fill='x')
         self.polling_label = tk.Label(polling_frame, text=f"Current: {self.polling_rate}ms ({1000//self.polling_rate} Hz)")
         self.polling_label.pack(anchor='w')
@@ -1253,14 +1483,36 @@ class DS4ControlUI(tk.Tk):
         # Bind 'c' key to set neutral orientation
         self.bind('<c>', self.set_neutral_orientation)
 
+    def _hid_reader_loop(self):
+        """Blocking HID reads on a dedicated thread. Only the raw report crosses threads;
+        all parsing and Tk work stays in poll_controller on the main thread."""
+        while self.is_running:
+            try:
+                report = self.h.read(64, timeout=100)
+            except hid.HIDException as e:
+                self._hid_error = e
+                return
+            if report:
+                self._hid_queue.append(report)
+
+    def _stop_hid_reader(self):
+        """Stop the reader thread before the device handle is closed"""
+        self.is_running = False
+        if self._hid_thread.is_alive() and self._hid_thread is not threading.current_thread():
+            self._hid_thread.join(timeout=0.5)
+
     def poll_controller(self):
         """
-        Reads from the controller on the main thread and conditionally updates the UI.
-        This avoids the GIL-related crash from the background thread.
+        Takes the latest report from the HID reader thread and conditionally updates the UI.
+        Tk itself is only ever touched from the main thread.
         """
         try:
-            # hid.read() is now safely on the main thread
-            report = self.h.read(64)
+            if self._hid_error is not None:
+                raise self._hid_error
+            try:
+                report = self._hid_queue.pop()
+            except IndexError:
+                report = None  # No new report since the last poll
             
             if report:
                 # Parse and process the data every time
@@ -1306,12 +1558,17 @@ class DS4ControlUI(tk.Tk):
                     # Redraw the Matplotlib canvas
                     self.canvas.draw()
                 
-                # Send data to Hammerspoon via UDP
-                    try:
-                        message = json.dumps(self.current_data).encode('utf-8')
-                        self.udp_socket.sendto(message, (self.udp_host, self.udp_port))
-                    except Exception as send_error:
-                        print(f"UDP send error: {send_error}")
+                # Send data to Hammerspoon via UDP (fixed-size binary packet, see _PACKET_FMT).
+                # The mapper only reacts to changes, so byte-identical packets are skipped.
+                try:
+                    packet = pack_controller_packet(report, controller_data['touchpad'])
+                    if packet != self._last_packet:
+                        self.udp_socket.send(packet)
+                        self._last_packet = packet
+                except (BlockingIOError, ConnectionRefusedError):
+                    pass  # Buffer full or Hammerspoon not listening; resent on the next poll
+                except Exception as send_error:
+                    print(f"UDP send error: {send_error}")
                 
         except hid.HIDException as e:
             print(f"Controller disconnected or HID error: {e}")
@@ -1630,6 +1887,16 @@ Battery:   {data['battery']}/15
         self.orientation_offset['yaw'] = self.orientation['yaw']
         print(f"Offset captured: {self.orientation_offset}")
 
+    def _debounced(self, key, fn):
+        """Wrap a Scale command so fn only runs once the slider has been still for 100 ms"""
+        return lambda value: self._schedule_slider(key, fn, value)
+
+    def _schedule_slider(self, key, fn, value):
+        timer = self._slider_timers.get(key)
+        if timer:
+            self.after_cancel(timer)
+        self._slider_timers[key] = self.after(100, lambda: fn(value))
+
     def update_alpha(self, value):
         """Update the complementary filter alpha value"""
         self.alpha = float(value)
@@ -2478,6 +2745,7 @@ Battery:   {data['battery']}/15
         
         # Close HID device
         if hasattr(self, 'h'):
+            self._stop_hid_reader()
             self.h.close()
         
         # Close UDP socket
@@ -2519,6 +2787,7 @@ Battery:   {data['battery']}/15
                 print(f"Error stopping tray icon: {e}")
         
         # Close connections
+        self._stop_hid_reader()
         self.udp_socket.close()
         self.h.close()
         self.destroy()
@@ -62,6 +62,11 @@ class DS4ControlUI(tk.Tk):
         else:
             self.h = None # In test mode, we don't need a real device
         
+        # Rumble output reports with the fixed header bytes filled in once;
+        # set_rumble_simple/set_rumble_0x11 only patch the motor and RGB slots
+        self._simple_report = bytearray([0x05, 0xFF, 0x04, 0x00] + [0]*28)   # USB, 32 bytes
+        self._full_report = bytearray([0x11, 0xc0, 0x20, 0xf3, 0xf3] + [0]*73)  # USB, 78 bytes
+        
         self.data_parser = DS4DataParser()
         
         # --- Thread-safe Queue for HID reports ---
@@ -332,11 +337,18 @@ class DS4ControlUI(tk.Tk):
         self.visualization_tab_modular._toggle_axis_lock(axis)
 
     def set_rumble_simple(self, left_rumble=0, right_rumble=0):
-        report = [0x05, 0xFF, 0x04, 0x00, left_rumble, right_rumble, 0, 0, 0] + [0]*23
+        report = self._simple_report
+        report[4] = left_rumble
+        report[5] = right_rumble
         self.h.write(bytes(report))
 
     def set_rumble_0x11(self, left_rumble=0, right_rumble=0, r=0, g=0, b=0):
-        report = [0x11, 0xc0, 0x20, 0xf3, 0xf3, 0x00, 0x00, right_rumble, left_rumble, r, g, b] + [0]*66
+        report = self._full_report
+        report[7] = right_rumble
+        report[8] = left_rumble
+        report[9] = r
+        report[10] = g
+        report[11] = b
         self.h.write(bytes(report))
 
     def trigger_tactile_feedback(self, trigger):
@@ -15,6 +15,59 @@ from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import time
 import json
 import os
+import math
+
+
+def build_rotation(roll, pitch, yaw):
+    """Combined 3x3 rotation: yaw (about Z), then roll (about X), then pitch (about Y)
+
+    Same matrix as scipy's Rotation.from_euler('zxy', [yaw, roll, pitch]) (extrinsic
+    axes), built by hand: for six vertices, constructing the Rotation costs more than
+    the single (6,3) @ (3,3) product it would replace.
+    """
+    # Each sin/cos is taken once per frame, on plain floats, so math beats NumPy's ufuncs
+    cr, sr = math.cos(roll), math.sin(roll)
+    cp, sp = math.cos(pitch), math.sin(pitch)
+    cy, sy = math.cos(yaw), math.sin(yaw)
+    rot_yaw = np.array([[cy, -sy, 0], [sy, cy, 0], [0, 0, 1]])      # Turning left/right
+    rot_roll = np.array([[1, 0, 0], [0, cr, -sr], [0, sr, cr]])     # Side tilting
+    rot_pitch = np.array([[cp, 0, sp], [0, 1, 0], [-sp, 0, cp]])    # Forward/backward tilt
+    return rot_pitch @ rot_roll @ rot_yaw
+
+
+# 30-30-120 degree triangle with depth, built once: the geometry never changes.
+# Top point (controller facing direction) at 120 degrees, bottom points at 30 degrees each.
+_BASE_WIDTH = 500
+_DEPTH = 200
+_HEIGHT_RATIO = math.tan(math.radians(30))
+_HEIGHT = _BASE_WIDTH * _HEIGHT_RATIO  # Height from base to top
+_PRISM_VERTS = np.array([
+    # Front face (controller face)
+    [-_BASE_WIDTH/2, -_HEIGHT/2, _DEPTH/2],    # Bottom left
+    [_BASE_WIDTH/2, -_HEIGHT/2, _DEPTH/2],     # Bottom right
+    [0, _HEIGHT/2, _DEPTH/2],                  # Top center (controller facing)
+    # Back face
+    [-_BASE_WIDTH/2, -_HEIGHT/2, -_DEPTH/2],   # Bottom left
+    [_BASE_WIDTH/2, -_HEIGHT/2, -_DEPTH/2],    # Bottom right
+    [0, _HEIGHT/2, -_DEPTH/2],                 # Top center
+])
+
+# Vertex indices of each prism face into the stacked (front 0-2, back 3-5) vertex array
+_PRISM_FACES = (
+    [0, 1, 2],      # Front
+    [3, 4, 5],      # Back
+    [0, 1, 4, 3],   # Bottom
+    [1, 2, 5, 4],   # Right
+    [2, 0, 3, 5],   # Left
+)
+
+# Red line along each lockable axis (world frame, not rotated with the controller)
+_LOCK_LINES = {
+    'roll': np.array([[0, -300, 0], [0, 300, 0]]),    # Y-axis (side tilting)
+    'pitch': np.array([[-300, 0, 0], [300, 0, 0]]),   # X-axis (forward/backward tilt)
+    'yaw': np.array([[0, 0, -300], [0, 0, 300]]),     # Z-axis (turning left/right)
+}
+
 
 class VisualizationTab:
     def __init__(self, parent_frame, on_export_data=None, on_export_json=None, on_toggle_axis_lock=None, on_set_neutral=None):
@@ -51,7 +104,11 @@ class VisualizationTab:
         
         # Visualization elements
         self.gyro_triangle = None
-        self.lock_indicator = None
+        self.lock_indicators = {}
+        
+        # Last rotation matrix, keyed by the rounded display angles (see update_gyro_triangle)
+        self._last_angles = None
+        self._last_rotation = None
         
         self._build_ui()
 
@@ -91,6 +148,10 @@ class VisualizationTab:
         self.ax_gyro.text2D(0.02, 0.98, 'Controller Orientation', transform=self.ax_gyro.transAxes, fontsize=10, verticalalignment='top')
         self.gyro_ball, = self.ax_gyro.plot([0], [0], [0], 'ro', markersize=15, label='Raw Gyro Data')
         self.gyro_text = self.ax_gyro.text2D(0.02, 0.02, 'Gyro: X=0 Y=0 Z=0', transform=self.ax_gyro.transAxes, fontsize=9, verticalalignment='bottom', bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
+        # Lock indicator lines, created once and shown/hidden as the lock changes
+        for axis, line in _LOCK_LINES.items():
+            self.lock_indicators[axis], = self.ax_gyro.plot(line[:, 0], line[:, 1], line[:, 2],
+                                                            'r-', linewidth=3, alpha=0.8, visible=False)
         # Axis Locks Section
         lock_frame = tk.Frame(frame)
         lock_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
@@ -170,9 +231,9 @@ class VisualizationTab:
                     'processed': {
                         'orientation': self.current_data['orientation'],
                         'orientation_degrees': {
-                            'roll': np.degrees(self.current_data['orientation']['roll']),
-                            'pitch': np.degrees(self.current_data['orientation']['pitch']),
-                            'yaw': np.degrees(self.current_data['orientation']['yaw'])
+                            'roll': math.degrees(self.current_data['orientation']['roll']),
+                            'pitch': math.degrees(self.current_data['orientation']['pitch']),
+                            'yaw': math.degrees(self.current_data['orientation']['yaw'])
                         }
                     }
                 },
@@ -242,7 +303,8 @@ class VisualizationTab:
         self.update_orientation_with_fusion(gyro['x'], gyro['y'], gyro['z'], 
                                           accel['x'], accel['y'], accel['z'])
         
-        self.canvas.draw()
+        # Coalesce into one redraw at the next idle slot
+        self.canvas.draw_idle()
 
     def update_data_display(self, data):
         """Update the data display text area"""
@@ -288,9 +350,9 @@ Gyro:      X={data['gyro']['x']:6d} Y={data['gyro']['y']:6d} Z={data['gyro']['z'
 Accel:     X={data['accelerometer']['x']:6d} Y={data['accelerometer']['y']:6d} Z={data['accelerometer']['z']:6d}
 
 SENSORS (PROCESSED):
-Roll:      {self.orientation['roll']:8.3f} rad ({np.degrees(self.orientation['roll']):6.1f}°)
-Pitch:     {self.orientation['pitch']:8.3f} rad ({np.degrees(self.orientation['pitch']):6.1f}°)
-Yaw:       {self.orientation['yaw']:8.3f} rad ({np.degrees(self.orientation['yaw']):6.1f}°)
+Roll:      {self.orientation['roll']:8.3f} rad ({math.degrees(self.orientation['roll']):6.1f}°)
+Pitch:     {self.orientation['pitch']:8.3f} rad ({math.degrees(self.orientation['pitch']):6.1f}°)
+Yaw:       {self.orientation['yaw']:8.3f} rad ({math.degrees(self.orientation['yaw']):6.1f}°)
 
 AXIS LOCKS:
 Roll:      {self.axis_locks['roll']}
@@ -315,13 +377,13 @@ Yaw:       {self.axis_locks['yaw']}
         
         # Calculate pitch and roll from accelerometer data
         # We use atan2 for a stable calculation in all quadrants
-        accel_roll = np.arctan2(accel_y, accel_z)
-        accel_pitch = np.arctan2(-accel_x, np.sqrt(accel_y**2 + accel_z**2))
+        accel_roll = math.atan2(accel_y, accel_z)
+        accel_pitch = math.atan2(-accel_x, math.sqrt(accel_y*accel_y + accel_z*accel_z))
         
         # Convert gyro rates to radians/sec with adjustable sensitivity
-        gyro_roll_rate = np.radians(gyro_x / self.gyro_sensitivity)   # X-axis for roll
-        gyro_pitch_rate = np.radians(gyro_z / self.gyro_sensitivity)  # Z-axis for pitch
-        gyro_yaw_rate = np.radians(gyro_y / self.gyro_sensitivity)    # Y-axis for yaw
+        gyro_roll_rate = math.radians(gyro_x / self.gyro_sensitivity)   # X-axis for roll
+        gyro_pitch_rate = math.radians(gyro_z / self.gyro_sensitivity)  # Z-axis for pitch
+        gyro_yaw_rate = math.radians(gyro_y / self.gyro_sensitivity)    # Y-axis for yaw
         
         # Apply complementary filter with better responsiveness
         # Roll: primarily gyro, corrected by accelerometer (unless locked)
@@ -349,118 +411,42 @@ Yaw:       {self.axis_locks['yaw']}
 
     def update_gyro_triangle(self, roll, pitch, yaw):
         """Update the 3D triangle to show controller orientation, adjusted for a custom offset."""
-        # Remove previous triangle if it exists
-        if self.gyro_triangle is not None:
-            self.gyro_triangle.remove()
-        
         # Apply the custom orientation offset
         display_roll = roll - self.orientation_offset['roll']
         display_pitch = pitch - self.orientation_offset['pitch']
         display_yaw = yaw - self.orientation_offset['yaw']
         
-        # Create a 30-30-120 degree triangle with depth
-        # Base triangle dimensions
-        base_width = 500
-        depth = 200
-        
-        # Calculate triangle points for 30-30-120 degree triangle
-        # Top point (controller facing direction) at 120 degrees
-        # Bottom points at 30 degrees each
-        height = base_width * np.tan(np.radians(30))  # Height from base to top
-        
-        # Front face (controller face)
-        front_triangle = np.array([
-            [-base_width/2, -height/2, depth/2],   # Bottom left
-            [base_width/2, -height/2, depth/2],    # Bottom right
-            [0, height/2, depth/2]                 # Top center (controller facing)
-        ])
-        
-        # Back face
-        back_triangle = np.array([
-            [-base_width/2, -height/2, -depth/2],  # Bottom left
-            [base_width/2, -height/2, -depth/2],   # Bottom right
-            [0, height/2, -depth/2]                # Top center
-        ])
-        
-        # Apply rotation based on gyro data
-        # Apply rotations using the fused orientation angles
-        def rotate_point(point, roll, pitch, yaw):
-            x, y, z = point
-            
-            # Yaw rotation (turning left/right)
-            if abs(yaw) > 0.001:
-                cos_yaw = np.cos(yaw)
-                sin_yaw = np.sin(yaw)
-                x_new = x * cos_yaw - y * sin_yaw
-                y_new = x * sin_yaw + y * cos_yaw
-                x, y = x_new, y_new
-            
-            # Roll rotation (side tilting)
-            if abs(roll) > 0.001:
-                cos_roll = np.cos(roll)
-                sin_roll = np.sin(roll)
-                y_new = y * cos_roll - z * sin_roll
-                z_new = y * sin_roll + z * cos_roll
-                y, z = y_new, z_new
-            
-            # Pitch rotation (forward/backward tilt)
-            if abs(pitch) > 0.001:
-                cos_pitch = np.cos(pitch)
-                sin_pitch = np.sin(pitch)
-                x_new = x * cos_pitch + z * sin_pitch
-                z_new = -x * sin_pitch + z * cos_pitch
-                x, z = x_new, z_new
-            
-            return [x, y, z]
-        
-        # Rotate all points using the offset-adjusted orientation
-        rotated_front = np.array([rotate_point(p, display_roll, display_pitch, display_yaw) for p in front_triangle])
-        rotated_back = np.array([rotate_point(p, display_roll, display_pitch, display_yaw) for p in back_triangle])
-        
-        # Create 3D object faces
-        faces = []
-        
-        # Front and back faces
-        faces.append(rotated_front)
-        faces.append(rotated_back)
-        
-        # Side faces (connecting front and back)
-        faces.append([rotated_front[0], rotated_front[1], rotated_back[1], rotated_back[0]])  # Bottom
-        faces.append([rotated_front[1], rotated_front[2], rotated_back[2], rotated_back[1]])  # Right
-        faces.append([rotated_front[2], rotated_front[0], rotated_back[0], rotated_back[2]])  # Left
-        
-        # Create the 3D object
-        poly3d = Poly3DCollection(faces, alpha=0.7, facecolor='green', edgecolor='black')
-        
-        # Add to the plot
-        self.gyro_triangle = self.ax_gyro.add_collection3d(poly3d)
-        
-        # Add red line for locked axis if any
-        if self.locked_axis:
-            self.add_locked_axis_indicator(display_roll, display_pitch, display_yaw)
-
-    def add_locked_axis_indicator(self, roll, pitch, yaw):
-        """Add a red line to show which axis is locked"""
-        # Remove previous indicator if it exists
-        if self.lock_indicator is not None:
-            self.lock_indicator.remove()
+        # Consecutive frames usually repeat to ~3 decimals; if the angles haven't
+        # moved, the prism already shows this orientation
+        angles = (round(display_roll, 3), round(display_pitch, 3), round(display_yaw, 3))
+        if angles == self._last_angles and self.gyro_triangle is not None:
+            self.update_locked_axis_indicator()
+            return
+        self._last_angles = angles
+        self._last_rotation = build_rotation(display_roll, display_pitch, display_yaw)
+        
+        # Rotate all points using the offset-adjusted orientation: one matmul over both faces
+        rotated = _PRISM_VERTS @ self._last_rotation.T
+        
+        # Create 3D object faces by indexing the rotated vertices
+        faces = [rotated[face] for face in _PRISM_FACES]
+        
+        # Create the 3D object on first use, then just move its vertices
+        if self.gyro_triangle is None:
+            poly3d = Poly3DCollection(faces, alpha=0.7, facecolor='green', edgecolor='black')
+            self.gyro_triangle = self.ax_gyro.add_collection3d(poly3d)
+        else:
+            self.gyro_triangle.set_verts(faces)
         
-        # Create a line along the locked axis
-        if self.locked_axis == 'roll':
-            # Red line along Y-axis (roll axis - side tilting)
-            y_line = np.array([[0, -300, 0], [0, 300, 0]])
-            self.lock_indicator, = self.ax_gyro.plot(y_line[:, 0], y_line[:, 1], y_line[:, 2], 
-                                                   'r-', linewidth=3, alpha=0.8)
-        elif self.locked_axis == 'pitch':
-            # Red line along X-axis (pitch axis - forward/backward tilt)
-            x_line = np.array([[-300, 0, 0], [300, 0, 0]])
-            self.lock_indicator, = self.ax_gyro.plot(x_line[:, 0], x_line[:, 1], x_line[:, 2], 
-                                                   'r-', linewidth=3, alpha=0.8)
-        elif self.locked_axis == 'yaw':
-            # Red line along Z-axis (yaw axis - turning left/right)
-            z_line = np.array([[0, 0, -300], [0, 0, 300]])
-            self.lock_indicator, = self.ax_gyro.plot(z_line[:, 0], z_line[:, 1], z_line[:, 2], 
-                                                   'r-', linewidth=3, alpha=0.8)
+        # Show the red line for the locked axis, if any
+        self.update_locked_axis_indicator()
+
+    def update_locked_axis_indicator(self):
+        """Show the red line along the locked axis and hide the others"""
+        for axis, line in self.lock_indicators.items():
+            visible = axis == self.locked_axis
+            if line.get_visible() != visible:
+                line.set_visible(visible)
 
     def set_sensor_fusion_parameters(self, alpha, gyro_sensitivity, damping_factor):
         """Set the sensor fusion parameters from the main window"""
@@ -229,9 +229,73 @@ function controller.processData(data)
 
         if mapping then
             postKeyEvent(mapping)
+            return true
         end
     end
     -- "release" events are ignored for now, but can be handled here in the future.
+    return false
+end
+
+-- ## BINARY PACKETS (DS4BinaryProtocol) ## --
+-- 9 bytes: header 0x44, button flags low/high, dpad, timestamp low/high (uint16 LE), CRC-8
+-- Sent by the latency tester, one packet per button press. Once a press has been
+-- turned into a key event the packet is echoed to ACK_PORT so the tester can time it.
+
+local BINARY_HEADER = 0x44
+local BINARY_PACKET_SIZE = 9
+local ACK_HOST = "127.0.0.1"
+local ACK_PORT = 12347 -- 12346 is the UI's IPC socket
+
+-- Bit order must match DS4BinaryProtocol.BUTTON_MAPPING
+local binaryButtons = {
+    "square", "cross", "circle", "triangle",
+    "l1", "r1", "l2_pressed", "r2_pressed",
+    "share", "options", "l3", "r3",
+    "ps_button", "touchpad_pressed",
+}
+local binaryDpad = {"dpad_up", "dpad_down", "dpad_left", "dpad_right"}
+
+-- CRC-8 (polynomial 0x07) lookup table, same as DS4BinaryProtocol._CRC_TBL
+local crcTable = {}
+for i = 0, 255 do
+    local crc = i
+    for _ = 1, 8 do
+        if crc & 0x80 ~= 0 then
+            crc = ((crc << 1) ~ 0x07) & 0xFF
+        else
+            crc = (crc << 1) & 0xFF
+        end
+    end
+    crcTable[i] = crc
+end
+
+local ackSocket = nil
+
+function controller.processBinaryData(data)
+    local header, low, high, dpad = string.unpack("<BBBB", data)
+    if header ~= BINARY_HEADER then return end
+
+    local crc = 0
+    for i = 1, BINARY_PACKET_SIZE - 1 do
+        crc = crcTable[crc ~ data:byte(i)]
+    end
+    if crc ~= data:byte(BINARY_PACKET_SIZE) then return end
+
+    local flags = low | (high << 8)
+    local injected = false
+    for i, name in ipairs(binaryButtons) do
+        if flags & (1 << (i - 1)) ~= 0 then
+            injected = controller.processData("press," .. name) or injected
+        end
+    end
+    if binaryDpad[dpad] then
+        injected = controller.processData("press," .. binaryDpad[dpad]) or injected
+    end
+
+    if injected then
+        ackSocket = ackSocket or hs.socket.udp.new()
+        ackSocket:send(data, ACK_HOST, ACK_PORT)
+    end
 end
 
 
@@ -243,7 +307,9 @@ function controller.startListener(host, port)
     -- Create a UDP server socket, which binds and sets the callback in one step.
     -- This is the correct and most efficient way to create a UDP listener in Hammerspoon.
     local sock = hs.socket.udp.server(port, function(data, from_host, from_port)
-        if data and #data > 0 then
+        if data and #data == BINARY_PACKET_SIZE and data:byte(1) == BINARY_HEADER then
+            controller.processBinaryData(data)
+        elseif data and #data > 0 then
             controller.processData(data)
         end
     end)
@@ -263,6 +329,10 @@ function controller.startListener(host, port)
 end
 
 function controller.stopListener()
+    if ackSocket then
+        ackSocket:close()
+        ackSocket = nil
+    end
     if controller.listener_socket then
         controller.listener_socket:close()
         controller.listener_socket = nil
@@ -22,10 +22,17 @@ import socket
 import os
 import threading
 import queue
+import struct
+import math
+import string
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from PIL import Image, ImageTk, ImageDraw
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import PolyCollection
 import numpy as np
 from tkmacosx import Button
 import pystray
@@ -34,6 +41,70 @@ VENDOR_ID = 1356
 PRODUCT_ID = 2508
 SETTINGS_FILE = "ds4_settings.json"
 
+# Precompiled layouts for the signed 16-bit fields of the DS4 input report
+_SENSOR_STRUCT = struct.Struct('<hhhhhh')  # gyro x/y/z, accel x/y/z at offset 13
+_TOUCH_STRUCT = struct.Struct('<hh')       # touchpad x/y at offset 36
+
+# DS4 D-pad nibble: 0=up, 1=ne, 2=right, 3=se, 4=down, 5=sw, 6=left, 7=nw, 8=none
+_DPAD = ('up', 'ne', 'right', 'se', 'down', 'sw', 'left', 'nw', 'none')
+
+def _build_button_table():
+    """One prebuilt buttons dict per state: face buttons (byte 5 high nibble) x byte 6"""
+    table = []
+    for face in range(16):
+        for b2 in range(256):
+            table.append({
+                'square': bool(face & 0x1),
+                'cross': bool(face & 0x2),
+                'circle': bool(face & 0x4),
+                'triangle': bool(face & 0x8),
+                'l1': bool(b2 & 0x01),
+                'r1': bool(b2 & 0x02),
+                'l2_pressed': bool(b2 & 0x04),
+                'r2_pressed': bool(b2 & 0x08),
+                'share': bool(b2 & 0x10),
+                'options': bool(b2 & 0x20),
+                'l3': bool(b2 & 0x40),
+                'r3': bool(b2 & 0x80)
+            })
+    return tuple(table)
+
+# Indexed by ((byte5 & 0xF0) << 4) | byte6. Entries are shared between reports: read-only.
+_BUTTON_TABLE = _build_button_table()
+
+# Tactile threshold line styles, low/medium/high (trigger visualization)
+_THRESHOLD_COLORS = ('green', 'orange', 'red')
+_THRESHOLD_DASHES = ((3, 3), (5, 5), (7, 7))
+
+# Gyro plot: fixed camera (elev 30, azim -60 like the old mplot3d default). Rows are the
+# screen right/up vectors and the depth towards the viewer, so one matmul projects to 2D.
+_EL, _AZ = np.radians(30), np.radians(-60)
+_GYRO_VIEW = np.array([
+    [-np.sin(_AZ), np.cos(_AZ), 0.0],
+    [-np.sin(_EL) * np.cos(_AZ), -np.sin(_EL) * np.sin(_AZ), np.cos(_EL)],
+    [np.cos(_EL) * np.cos(_AZ), np.cos(_EL) * np.sin(_AZ), np.sin(_EL)],
+])
+
+# 30-30-120 degree triangle with depth: front face (0-2), back face (3-5)
+_TRI_W, _TRI_D = 500, 200
+_TRI_H = _TRI_W * np.tan(np.radians(30))  # Height from base to top
+_GYRO_BODY = np.array([
+    [-_TRI_W/2, -_TRI_H/2, _TRI_D/2],   # Bottom left
+    [_TRI_W/2, -_TRI_H/2, _TRI_D/2],    # Bottom right
+    [0, _TRI_H/2, _TRI_D/2],            # Top center (controller facing)
+    [-_TRI_W/2, -_TRI_H/2, -_TRI_D/2],
+    [_TRI_W/2, -_TRI_H/2, -_TRI_D/2],
+    [0, _TRI_H/2, -_TRI_D/2],
+]).T
+_GYRO_FACES = ([0, 1, 2], [3, 4, 5], [0, 1, 4, 3], [1, 2, 5, 4], [2, 0, 3, 5])  # front, back, bottom, right, left
+
+# Red line along the locked axis, in world coordinates (not rotated with the controller)
+_LOCK_LINES = {
+    'roll': _GYRO_VIEW @ np.array([[0, 0], [-300, 300], [0, 0]]),   # Y-axis (side tilting)
+    'pitch': _GYRO_VIEW @ np.array([[-300, 300], [0, 0], [0, 0]]),  # X-axis (forward/backward tilt)
+    'yaw': _GYRO_VIEW @ np.array([[0, 0], [0, 0], [-300, 300]]),    # Z-axis (turning left/right)
+}
+
 # Output report for lightbar and rumble (USB, report ID 0x05, 32 bytes)
 def set_lightbar_and_rumble(h, r, g, b, left_rumble=0, right_rumble=0):
     report = [0x05, 0xFF, 0x04, 0x00, left_rumble, right_rumble, r, g, b] + [0]*23
@@ -688,10 +759,19 @@ class DS4ControlUI(tk.Tk):
         self.withdraw()
         
         self.h = hid.Device(vid=VENDOR_ID, pid=PRODUCT_ID)
+        # Non-blocking reads so each poll can drain every queued report (see _poll_loop)
+        self.h.nonblocking = True
+        
+        # Rumble output reports with the fixed header bytes filled in once;
+        # set_rumble_simple/set_rumble_0x11 only patch the motor and RGB slots
+        self._simple_report = bytearray([0x05, 0xFF, 0x04, 0x00] + [0]*28)   # USB, 32 bytes
+        self._full_report = bytearray([0x11, 0xc0, 0x20, 0xf3, 0xf3] + [0]*73)  # USB, 78 bytes
         
-        # --- Main Thread Polling Support ---
+        # --- HID Polling Thread Support ---
         self.text_update_counter = 0
         self.is_running = True
+        self._data_lock = threading.Lock()  # guards current_data/orientation between poll thread and Tk
+        self._hid_error = None              # set by the poll thread, acted on by the Tk tick
         # -------------------------
         
         # --- UDP Socket Setup for Hammerspoon Communication ---
@@ -699,6 +779,9 @@ class DS4ControlUI(tk.Tk):
         self.udp_port = 12345        # Port for Hammerspoon to listen on
         self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Never let a full send buffer stall the poll loop; a dropped datagram beats a late one
+        self.udp_socket.setblocking(False)
+        self._udp_addr = (self.udp_host, self.udp_port)
         print(f"Broadcasting controller data to UDP {self.udp_host}:{self.udp_port}")
         
         # OPTIMIZATION: Create a dedicated queue for UDP packets
@@ -713,6 +796,7 @@ class DS4ControlUI(tk.Tk):
         }
         self.udp_packets_sent = 0
         self.udp_packets_saved = 0
+        self.udp_packets_dropped = 0  # Send buffer full (non-blocking socket)
         # -----------------------------------------------------
         
 # --- ADD THE CODE BELOW ---
@@ -732,14 +816,20 @@ class DS4ControlUI(tk.Tk):
         # --- Optimization Support ---
         self.text_update_counter = 0
         self.last_poll_time = 0
+        self._last_draw = 0.0  # time.monotonic() of the last plot frame
+        self._pending_updates = {}  # Label updates waiting for the next idle flush
+        self._widgets_ready = False  # Set once create_widgets has built every tab
         # ---------------------------
         
-        # Load settings from file
+        # Load settings from file (axis_locks always exists, even before settings load)
+        self.axis_locks = {'roll': False, 'pitch': False, 'yaw': False}
         self.load_settings()
         
         # Initialize orientation tracking with sensor fusion
         self.orientation = {'roll': 0.0, 'pitch': 0.0, 'yaw': 0.0}
-        self.last_time = time.time()
+        self.last_time_ns = time.monotonic_ns()  # Fusion dt clock; immune to wall-clock jumps
+        # Snapshot of orientation handed out in current_data, rewritten in place each report
+        self._orientation_buf = {'roll': 0.0, 'pitch': 0.0, 'yaw': 0.0}
         
         # Store current controller data for export
         self.current_data = None
@@ -767,7 +857,9 @@ class DS4ControlUI(tk.Tk):
         # Start the tray flag checker
         self.check_tray_flags()
         
-        # Start the main thread polling
+        # Start the HID polling thread, then the Tk-side UI tick
+        self._poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self._poll_thread.start()
         self.poll_controller()
         
         # Show startup notification
@@ -794,7 +886,7 @@ class DS4ControlUI(tk.Tk):
                 # Get packet from queue with timeout
                 packet = self.udp_queue.get(timeout=0.001)  # 1ms timeout
                 if packet:
-                    self.udp_socket.sendto(packet, (self.udp_host, self.udp_port))
+                    self.udp_socket.sendto(packet, self._udp_addr)
             except queue.Empty:
                 continue  # No packets to send
             except Exception as e:
@@ -825,14 +917,33 @@ class DS4ControlUI(tk.Tk):
         self.tab_control.add(self.rumble_tab, text='Rumble')
         
         self.tab_control.pack(expand=1, fill='both')
+        
+        # Track tab/window visibility on change instead of querying Tcl every UI tick
+        self._visual_tab_active = False
+        self._visible = False  # Window starts withdrawn to the tray
+        self.tab_control.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+        self.bind('<Map>', self._on_map_change)
+        self.bind('<Unmap>', self._on_map_change)
+        
         self.create_lightbar_tab()
         self.create_visualization_tab()
         self.create_settings_tab()
         self.create_rumble_tab()
         
         # Update UI elements with loaded settings
+        self._widgets_ready = True
         self.update_ui_from_settings()
 
+    def _on_tab_changed(self, event=None):
+        """Remember whether the Live Visualization tab is the selected one"""
+        self._visual_tab_active = self.tab_control.select() == str(self.visual_tab)
+
+    def _on_map_change(self, event):
+        """Track whether the main window is shown (deiconified) or hidden/minimized"""
+        # Toplevel bindings also fire for every child widget; only the window itself matters
+        if event.widget is self:
+            self._visible = event.type == tk.EventType.Map
+
     def create_lightbar_tab(self):
         frame = self.lightbar_tab
         tk.Label(frame, text="Red").pack()
@@ -909,8 +1020,7 @@ class DS4ControlUI(tk.Tk):
 
     def create_visualization_tab(self):
         frame = self.visual_tab
-        # Set up matplotlib figure with 3D support
-        from mpl_toolkits.mplot3d import Axes3D
+        # Set up matplotlib figure
         self.fig = plt.figure(figsize=(10, 4))
         
         # Analog sticks plot (circular)
@@ -928,33 +1038,41 @@ class DS4ControlUI(tk.Tk):
         self.ax_stick.add_patch(circle)
         
         # Stick indicators
-        self.stick_left, = self.ax_stick.plot([], [], 'bo', markersize=10, label='Left Stick')
-        self.stick_right, = self.ax_stick.plot([], [], 'ro', markersize=10, label='Right Stick')
+        # (animated artists are left out of full draws and blitted in update_visualizations)
+        self.stick_left, = self.ax_stick.plot([], [], 'bo', markersize=10, label='Left Stick', animated=True)
+        self.stick_right, = self.ax_stick.plot([], [], 'ro', markersize=10, label='Right Stick', animated=True)
         self.ax_stick.legend(loc='upper left')
         
         # Trigger bars on the sides (vertical bars on left and right)
-        self.l2_bar = self.ax_stick.bar([-1], [0], width=0.2, color='blue', alpha=0.7, bottom=-1.0)
-        self.r2_bar = self.ax_stick.bar([1], [0], width=0.2, color='red', alpha=0.7, bottom=-1.0)
+        self.l2_bar = self.ax_stick.bar([-1], [0], width=0.2, color='blue', alpha=0.7, bottom=-1.0, animated=True)
+        self.r2_bar = self.ax_stick.bar([1], [0], width=0.2, color='red', alpha=0.7, bottom=-1.0, animated=True)
         
-        # 3D Gyro plot
-        self.ax_gyro = self.fig.add_subplot(122, projection='3d')
+        # Gyro plot: a plain 2D axes, 3D points are projected through _GYRO_VIEW
+        self.ax_gyro = self.fig.add_subplot(122)
         self.ax_gyro.set_title('Gyroscope (3D)')
-        self.ax_gyro.set_xlabel('X')
-        self.ax_gyro.set_ylabel('Y')
-        self.ax_gyro.set_zlabel('Z')
+        self.ax_gyro.set_aspect('equal')
         self.ax_gyro.set_xlim(-800, 800)
         self.ax_gyro.set_ylim(-800, 800)
-        self.ax_gyro.set_zlim(-800, 800)
+        self.ax_gyro.set_xticks([])
+        self.ax_gyro.set_yticks([])
         
-        # 3D triangle for gyro orientation
-        self.gyro_triangle = None
-        self.ax_gyro.text2D(0.02, 0.98, 'Controller Orientation', transform=self.ax_gyro.transAxes, fontsize=10, verticalalignment='top')
+        # Projected X/Y/Z reference axes (static, part of the cached background)
+        for i, name in enumerate('XYZ'):
+            (x0, x1), (y0, y1) = (_GYRO_VIEW[:2, i:i+1] * [-800, 800])
+            self.ax_gyro.plot([x0, x1], [y0, y1], color='gray', linewidth=0.8)
+            self.ax_gyro.text(x1, y1, name, color='gray', fontsize=9)
+        
+        # Triangle for gyro orientation (faces updated in place by update_gyro_triangle)
+        self.gyro_triangle = PolyCollection([], alpha=0.7, facecolor='green', edgecolor='black', animated=True)
+        self.ax_gyro.add_collection(self.gyro_triangle)
+        self.lock_indicator, = self.ax_gyro.plot([], [], 'r-', linewidth=3, alpha=0.8, animated=True)
+        self.ax_gyro.text(0.02, 0.98, 'Controller Orientation', transform=self.ax_gyro.transAxes, fontsize=10, verticalalignment='top')
         
         # Raw gyro data ball
-        self.gyro_ball, = self.ax_gyro.plot([0], [0], [0], 'ro', markersize=15, label='Raw Gyro Data')
+        self.gyro_ball, = self.ax_gyro.plot([0], [0], 'ro', markersize=15, label='Raw Gyro Data', animated=True)
         
         # Raw data display text
-        self.gyro_text = self.ax_gyro.text2D(0.02, 0.02, 'Gyro: X=0 Y=0 Z=0', transform=self.ax_gyro.transAxes, fontsize=9, verticalalignment='bottom', bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
+        self.gyro_text = self.ax_gyro.text(0.02, 0.02, 'Gyro: X=0 Y=0 Z=0', transform=self.ax_gyro.transAxes, fontsize=9, verticalalignment='bottom', bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8), animated=True)
         
         # Axis Locks Section (moved to gyro panel)
         lock_frame = tk.Frame(frame)
@@ -1005,6 +1123,7 @@ class DS4ControlUI(tk.Tk):
                                 yscrollcommand=scrollbar.set, wrap=tk.WORD)
         self.data_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=self.data_text.yview)
+        self._data_display_lines = None  # Last text shown, per line (see update_data_display)
         
         # Export buttons
         export_frame = tk.Frame(data_frame)
@@ -1020,115 +1139,165 @@ class DS4ControlUI(tk.Tk):
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame)
         self.canvas.get_tk_widget().pack(side=tk.LEFT, fill='both', expand=1)
         
+        # Cached axes backgrounds for blitting; refreshed after every full draw (incl. resize)
+        self._bg_stick = None
+        self._bg_gyro = None
+        self.canvas.mpl_connect('draw_event', self._cache_plot_backgrounds)
+        
         # Bind 'c' key to set neutral orientation
         self.bind('<c>', self.set_neutral_orientation)
 
-    def poll_controller(self):
+    def _poll_loop(self):
         """
-        Reads from the controller on the main thread and conditionally updates the UI.
-        This avoids the GIL-related crash from the background thread.
+        Reads the controller in a dedicated thread at the device's own report rate.
+        Parsing, sensor fusion and the UDP send to Hammerspoon all happen here, so
+        input latency no longer depends on the Tk event loop. Nothing in this
+        method may touch a Tk widget; the UI picks up current_data in poll_controller.
         """
-        try:
-            # hid.read() is now safely on the main thread
-            report = self.h.read(64)
-            
-            if report:
-                # Parse and process the data every time
+        while self.is_running:
+            try:
+                # Block briefly for the next report, then drain anything else queued
+                # so we act only on the freshest one.
+                report = self.h.read(64, timeout=100)
+                if not report:
+                    continue
+                while True:
+                    nxt = self.h.read(64)
+                    if not nxt:
+                        break
+                    report = nxt
+                
                 controller_data = self.parse_controller_data(report)
                 gyro = controller_data['gyro']
                 accel = controller_data['accelerometer']
                 
-                # --- Conditional UI Updating (The main optimization) ---
-                is_visual_tab_active = False
-                if self.state() == 'normal': # Only check tabs if window is visible
-                    try:
-                        current_tab_text = self.tab_control.tab(self.tab_control.select(), "text")
-                        if current_tab_text == 'Live Visualization':
-                            is_visual_tab_active = True
-                    except tk.TclError:
-                        pass # Ignore error if tabs aren't ready
+                with self._data_lock:
+                    # Run fusion math regardless, so orientation data is current for UDP.
+                    # The 3D triangle is redrawn by the Tk tick, never from this thread.
+                    self.update_orientation_with_fusion(
+                        gyro['x'], gyro['y'], gyro['z'], 
+                        accel['x'], accel['y'], accel['z'],
+                        update_triangle=False
+                    )
+                    
+                    # Store data for the UI and export. These are shared references, not
+                    # per-report copies; export_json takes its own copy.
+                    orientation_buf = self._orientation_buf
+                    orientation_buf['roll'] = self.orientation['roll']
+                    orientation_buf['pitch'] = self.orientation['pitch']
+                    orientation_buf['yaw'] = self.orientation['yaw']
+                    controller_data['timestamp'] = time.time()  # Wall clock, also used for the UDP packet
+                    controller_data['orientation'] = orientation_buf
+                    controller_data['axis_locks'] = self.axis_locks
+                    self.current_data = controller_data
                 
-                # Run fusion math regardless, so orientation data is current for UDP
-                self.update_orientation_with_fusion(
-                    gyro['x'], gyro['y'], gyro['z'], 
-                    accel['x'], accel['y'], accel['z'],
-                    update_triangle=is_visual_tab_active # Only update 3D model if tab is visible
-                )
-
-                # Store data for UDP and export
-                self.current_data = controller_data
-                self.current_data['timestamp'] = time.time()
-                self.current_data['orientation'] = self.orientation.copy()
-                if hasattr(self, 'axis_locks'):
-                    self.current_data['axis_locks'] = self.axis_locks.copy()
+                self.send_digital_changes(controller_data)
                 
-                # Only do expensive UI drawing if the tab is visible
-                if is_visual_tab_active:
-                    self.update_visualizations(self.current_data)
+            except hid.HIDException as e:
+                if self.is_running:
+                    self._hid_error = e  # poll_controller quits on the main thread
+                return
+            except Exception as e:
+                print(f'Polling error: {e}')
+
+    def send_digital_changes(self, controller_data):
+        """Send changed buttons/d-pad to Hammerspoon via UDP (JSON for stability - testing)"""
+        try:
+            digital_changes = self.check_digital_changes(controller_data)
+            if digital_changes:
+                # TEMPORARY: Use JSON for stable UDP communication
+                essential_data = {
+                    'buttons': digital_changes['buttons'],
+                    'dpad': digital_changes['dpad'],
+                    'timestamp': controller_data['timestamp']
+                }
+                # orjson serializes straight to bytes in C; compact stdlib JSON otherwise
+                if orjson:
+                    message = orjson.dumps(essential_data)
+                else:
+                    message = json.dumps(essential_data, separators=(',', ':')).encode('utf-8')
+                try:
+                    self.udp_socket.sendto(message, self._udp_addr)
+                    self.udp_packets_sent += 1
+                    
+                    # OPTIMIZATION: For critical buttons, send immediately without waiting
+                    critical_buttons = ['cross', 'circle', 'triangle', 'square', 'options']
+                    has_critical = any(btn in digital_changes['buttons'] for btn in critical_buttons)
+                    
+                    if has_critical:
+                        # Send a second packet immediately for critical buttons
+                        self.udp_socket.sendto(message, self._udp_addr)
+                except BlockingIOError:
+                    # Send buffer full; drop rather than block
+                    self.udp_packets_dropped += 1
+            else:
+                self.udp_packets_saved += 1
+        except Exception as send_error:
+            print(f"UDP send error: {send_error}")
+
+    def poll_controller(self):
+        """
+        Tk-side tick: reflects the poll thread's latest data in the UI.
+        Runs every polling_rate ms on the main thread and only draws when the
+        visualization tab is showing.
+        """
+        if self._hid_error is not None:
+            print(f"Controller disconnected or HID error: {self._hid_error}")
+            self.quit_application() # Cleanly quit if controller is lost
+            return # Stop polling
+        
+        try:
+            # --- Conditional UI Updating (The main optimization) ---
+            # Only do expensive UI drawing if the window and the tab are visible
+            if self._visible and self._visual_tab_active:
+                # _orientation_buf is rewritten in place by the poll thread, so the angles
+                # (and the lock flags shown with them) are taken together under the lock
+                with self._data_lock:
+                    data = self.current_data
+                    orientation = self._orientation_buf
+                    roll, pitch, yaw = orientation['roll'], orientation['pitch'], orientation['yaw']
+                    axis_locks = self.axis_locks.copy()
+                
+                # Skip frames the display can't show anyway (polling can outrun 60 Hz)
+                now = time.monotonic()
+                if data is not None and now - self._last_draw >= 1/60:
+                    self._last_draw = now
+                    self.update_gyro_triangle(roll, pitch, yaw)
+                    self.update_visualizations(data)
                     
                     # Throttle the text display update
                     self.text_update_counter += 1
-                    update_text_frequency = 5 # Update text ~every 5th poll
+                    update_text_frequency = 5 # Update text ~every 5th tick
                     if self.text_update_counter >= update_text_frequency:
-                        self.update_data_display(self.current_data)
+                        self.update_data_display(data, {'roll': roll, 'pitch': pitch, 'yaw': yaw}, axis_locks)
                         self.text_update_counter = 0
-
-                    # Redraw the Matplotlib canvas
-                    self.canvas.draw()
                 
-                # Send data to Hammerspoon via UDP (JSON for stability - testing)
-                try:
-                    digital_changes = self.check_digital_changes(controller_data)
-                    if digital_changes:
-                        # TEMPORARY: Use JSON for stable UDP communication
-                        essential_data = {
-                            'buttons': digital_changes['buttons'],
-                            'dpad': digital_changes['dpad'],
-                            'timestamp': time.time()
-                        }
-                        message = json.dumps(essential_data).encode('utf-8')
-                        self.udp_socket.sendto(message, (self.udp_host, self.udp_port))
-                        
-                        # OPTIMIZATION: For critical buttons, send immediately without waiting
-                        critical_buttons = ['cross', 'circle', 'triangle', 'square', 'options']
-                        has_critical = any(btn in digital_changes['buttons'] for btn in critical_buttons)
-                        
-                        if has_critical:
-                            # Send a second packet immediately for critical buttons
-                            self.udp_socket.sendto(message, (self.udp_host, self.udp_port))
-                        
-                        self.udp_packets_sent += 1
-                    else:
-                        self.udp_packets_saved += 1
-                except Exception as send_error:
-                    print(f"UDP send error: {send_error}")
-                
-        except hid.HIDException as e:
-            print(f"Controller disconnected or HID error: {e}")
-            self.quit_application() # Cleanly quit if controller is lost
-            return # Stop polling
         except Exception as e:
-            print(f'Polling error: {e}')
+            print(f'UI update error: {e}')
             
-        # Schedule the next poll
+        # Schedule the next tick
         self.after(self.polling_rate, self.poll_controller)
 
     def parse_controller_data(self, report):
         """Parse all controller data from HID report"""
-        import struct
+        # hid.read() may hand back a list; unpack_from needs a buffer
+        report = bytes(report)
         
         data = {}
         
-        # Analog sticks (normalize to -1 to 1 range)
+        # Analog sticks (normalize to -1 to 1 range), all four axes in one array op.
+        # k/128 is exact in float32; tolist() hands back plain floats for JSON export.
+        sticks = np.frombuffer(report, dtype=np.uint8, count=4, offset=1).astype(np.float32)
+        lx, ly, rx, ry = ((sticks - 128.0) * (1.0 / 128.0)).tolist()
         data['left_stick'] = {
-            'x': (report[1] - 128) / 128,
-            'y': (report[2] - 128) / 128,
+            'x': lx,
+            'y': ly,
             'raw_x': report[1],
             'raw_y': report[2]
         }
         data['right_stick'] = {
-            'x': (report[3] - 128) / 128,
-            'y': (report[4] - 128) / 128,
+            'x': rx,
+            'y': ry,
             'raw_x': report[3],
             'raw_y': report[4]
         }
@@ -1147,63 +1316,30 @@ class DS4ControlUI(tk.Tk):
         button_byte1 = report[5]
         button_byte2 = report[6]
         
-        data['buttons'] = {
-            'square': bool(button_byte1 & 0x10),
-            'cross': bool(button_byte1 & 0x20),
-            'circle': bool(button_byte1 & 0x40),
-            'triangle': bool(button_byte1 & 0x80),
-            'l1': bool(button_byte2 & 0x01),
-            'r1': bool(button_byte2 & 0x02),
-            'l2_pressed': bool(button_byte2 & 0x04),
-            'r2_pressed': bool(button_byte2 & 0x08),
-            'share': bool(button_byte2 & 0x10),
-            'options': bool(button_byte2 & 0x20),
-            'l3': bool(button_byte2 & 0x40),
-            'r3': bool(button_byte2 & 0x80)
-        }
+        data['buttons'] = _BUTTON_TABLE[((button_byte1 & 0xF0) << 4) | button_byte2]
         
         # D-pad (byte 5, bits 0-3)
         dpad = button_byte1 & 0x0F
-        # Correct DS4 D-pad mapping: 8=none, 0=up, 1=ne, 2=right, 3=se, 4=down, 5=sw, 6=left, 7=nw
-        dpad_states = {
-            8: 'none',
-            0: 'up',
-            1: 'ne',    # north-east (up-right)
-            2: 'right', 
-            3: 'se',    # south-east (down-right)
-            4: 'down',
-            5: 'sw',    # south-west (down-left)
-            6: 'left',
-            7: 'nw'     # north-west (up-left)
-        }
-        data['dpad'] = dpad_states[dpad] or 'none'
+        data['dpad'] = _DPAD[dpad] if dpad <= 8 else 'none'
         data['dpad_raw'] = dpad  # Add raw value for debugging
         
         # PS button and touchpad (byte 7)
         data['ps_button'] = bool(report[7] & 0x01)
         data['touchpad_pressed'] = bool(report[7] & 0x02)
         
-        # Gyro (X, Y, Z)
-        data['gyro'] = {
-            'x': struct.unpack('<h', bytes(report[13:15]))[0],
-            'y': struct.unpack('<h', bytes(report[15:17]))[0],
-            'z': struct.unpack('<h', bytes(report[17:19]))[0]
-        }
-        
-        # Accelerometer (X, Y, Z)
-        data['accelerometer'] = {
-            'x': struct.unpack('<h', bytes(report[19:21]))[0],
-            'y': struct.unpack('<h', bytes(report[21:23]))[0],
-            'z': struct.unpack('<h', bytes(report[23:25]))[0]
-        }
+        # Gyro and accelerometer (X, Y, Z each) in one unpack
+        gx, gy, gz, ax, ay, az = _SENSOR_STRUCT.unpack_from(report, 13)
+        data['gyro'] = {'x': gx, 'y': gy, 'z': gz}
+        data['accelerometer'] = {'x': ax, 'y': ay, 'z': az}
         
         # Touchpad data (if available)
         if len(report) > 35:
+            tx, ty = _TOUCH_STRUCT.unpack_from(report, 36)
             data['touchpad'] = {
                 'active': bool(report[35] & 0x80),
                 'id': report[35] & 0x7F,
-                'x': struct.unpack('<h', bytes(report[36:38]))[0],
-                'y': struct.unpack('<h', bytes(report[38:40]))[0]
+                'x': tx,
+                'y': ty
             }
         else:
             data['touchpad'] = {
@@ -1258,9 +1394,8 @@ class DS4ControlUI(tk.Tk):
         self.l2_bar[0].set_height(data['l2']['value'] * 2)
         self.r2_bar[0].set_height(data['r2']['value'] * 2)
         
-        # Update trigger visualization in rumble tab
-        if hasattr(self, 'trigger_canvas'):
-            self.draw_trigger_visualization(data['l2']['raw'], data['r2']['raw'])
+        # Update trigger visualization in rumble tab (built in create_widgets, before any tick)
+        self.draw_trigger_visualization(data['l2']['raw'], data['r2']['raw'])
         
         # Check for tactile feedback
         self.check_tactile_feedback(data['l2']['raw'], data['r2']['raw'])
@@ -1269,21 +1404,47 @@ class DS4ControlUI(tk.Tk):
         gyro = data['gyro']
         accel = data['accelerometer']
         
-        self.gyro_ball.set_data([gyro['x']], [gyro['y']])
-        self.gyro_ball.set_3d_properties([gyro['z']])
+        ball_x, ball_y, _ = _GYRO_VIEW @ (gyro['x'], gyro['y'], gyro['z'])
+        self.gyro_ball.set_data([ball_x], [ball_y])
         self.gyro_text.set_text(f'Gyro: X={gyro["x"]} Y={gyro["y"]} Z={gyro["z"]}\nAccel: X={accel["x"]} Y={accel["y"]} Z={accel["z"]}')
+        # Orientation is fused once per report in _poll_loop; the triangle is drawn by poll_controller
+        
+        self.blit_visualizations()
+
+    def _cache_plot_backgrounds(self, event=None):
+        """Grab the static parts of both plots (grid, circle, labels) after a full draw"""
+        self._bg_stick = self.canvas.copy_from_bbox(self.ax_stick.bbox)
+        self._bg_gyro = self.canvas.copy_from_bbox(self.ax_gyro.bbox)
+
+    def blit_visualizations(self):
+        """Redraw only the moving artists over the cached backgrounds"""
+        if self._bg_stick is None:
+            # First frame: let Tk run one full draw at idle; its draw_event caches the backgrounds
+            self.canvas.draw_idle()
+            return
         
-        # Update orientation with sensor fusion
-        self.update_orientation_with_fusion(gyro['x'], gyro['y'], gyro['z'], 
-                                          accel['x'], accel['y'], accel['z'])
+        # Sticks & triggers
+        self.canvas.restore_region(self._bg_stick)
+        self.ax_stick.draw_artist(self.stick_left)
+        self.ax_stick.draw_artist(self.stick_right)
+        self.ax_stick.draw_artist(self.l2_bar[0])
+        self.ax_stick.draw_artist(self.r2_bar[0])
+        self.canvas.blit(self.ax_stick.bbox)
+        
+        # Gyro
+        self.canvas.restore_region(self._bg_gyro)
+        self.ax_gyro.draw_artist(self.gyro_triangle)
+        if self.locked_axis:
+            self.ax_gyro.draw_artist(self.lock_indicator)
+        self.ax_gyro.draw_artist(self.gyro_ball)
+        self.ax_gyro.draw_artist(self.gyro_text)
+        self.canvas.blit(self.ax_gyro.bbox)
 
-    def update_data_display(self, data):
+    def update_data_display(self, data, orientation, axis_locks):
         """Update the data display text area"""
-        # Store current data for export
-        self.current_data = data.copy()
-        self.current_data['timestamp'] = time.time()
-        self.current_data['orientation'] = self.orientation.copy()
-        self.current_data['axis_locks'] = self.axis_locks.copy()
+        # data is current_data as stored by _poll_loop and is read as-is rather than
+        # copied and re-stamped. Its 'orientation'/'axis_locks' entries are the live
+        # shared dicts, so the caller passes copies taken under _data_lock instead.
         
         # Format data for display
         display_text = f"""=== DS4 Controller Data Export ===
@@ -1321,14 +1482,14 @@ Gyro:      X={data['gyro']['x']:6d} Y={data['gyro']['y']:6d} Z={data['gyro']['z'
 Accel:     X={data['accelerometer']['x']:6d} Y={data['accelerometer']['y']:6d} Z={data['accelerometer']['z']:6d}
 
 SENSORS (PROCESSED):
-Roll:      {self.orientation['roll']:8.3f} rad ({np.degrees(self.orientation['roll']):6.1f}°)
-Pitch:     {self.orientation['pitch']:8.3f} rad ({np.degrees(self.orientation['pitch']):6.1f}°)
-Yaw:       {self.orientation['yaw']:8.3f} rad ({np.degrees(self.orientation['yaw']):6.1f}°)
+Roll:      {orientation['roll']:8.3f} rad ({math.degrees(orientation['roll']):6.1f}°)
+Pitch:     {orientation['pitch']:8.3f} rad ({math.degrees(orientation['pitch']):6.1f}°)
+Yaw:       {orientation['yaw']:8.3f} rad ({math.degrees(orientation['yaw']):6.1f}°)
 
 AXIS LOCKS:
-Roll:      {self.axis_locks['roll']}
-Pitch:     {self.axis_locks['pitch']}
-Yaw:       {self.axis_locks['yaw']}
+Roll:      {axis_locks['roll']}
+Pitch:     {axis_locks['pitch']}
+Yaw:       {axis_locks['yaw']}
 
 OTHER:
 Battery:   {data['battery']}/15
@@ -1336,14 +1497,24 @@ Battery:   {data['battery']}/15
 UDP OPTIMIZATION (JSON - Stable Testing):
 Packets Sent: {self.udp_packets_sent}
 Packets Saved: {self.udp_packets_saved}
+Packets Dropped: {self.udp_packets_dropped}
 Efficiency: {(self.udp_packets_saved / max(1, self.udp_packets_sent + self.udp_packets_saved) * 100):.1f}%
 Packet Size: ~300 bytes JSON (Binary: 8 bytes)
 Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
 """
         
-        # Update text widget
-        self.data_text.delete(1.0, tk.END)
-        self.data_text.insert(1.0, display_text)
+        # Update text widget: only rewrite the lines whose values changed, so Tk
+        # re-lays out a handful of lines instead of the whole widget
+        lines = display_text.split('\n')
+        previous = self._data_display_lines
+        if previous is None or len(previous) != len(lines):
+            self.data_text.delete(1.0, tk.END)
+            self.data_text.insert(1.0, display_text)
+        else:
+            for lineno, (old, new) in enumerate(zip(previous, lines), start=1):
+                if old != new:
+                    self.data_text.replace(f'{lineno}.0', f'{lineno}.end', new)
+        self._data_display_lines = lines
 
     def export_data(self):
         """Export current controller data to text file"""
@@ -1358,7 +1529,12 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
     def export_json(self):
         """Export current controller data to JSON file"""
         try:
-            if self.current_data is None:
+            with self._data_lock:
+                current_data = self.current_data
+                if current_data is not None:
+                    orientation = current_data['orientation'].copy()
+                    axis_locks = current_data['axis_locks'].copy()
+            if current_data is None:
                 print("No data available for export")
                 return
                 
@@ -1366,34 +1542,34 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
             
             # Prepare data for JSON export
             export_data = {
-                'timestamp': self.current_data['timestamp'],
+                'timestamp': current_data['timestamp'],
                 'datetime': time.strftime('%Y-%m-%d %H:%M:%S'),
                 'analog_inputs': {
-                    'left_stick': self.current_data['left_stick'],
-                    'right_stick': self.current_data['right_stick'],
-                    'l2_trigger': self.current_data['l2'],
-                    'r2_trigger': self.current_data['r2']
+                    'left_stick': current_data['left_stick'],
+                    'right_stick': current_data['right_stick'],
+                    'l2_trigger': current_data['l2'],
+                    'r2_trigger': current_data['r2']
                 },
-                'buttons': self.current_data['buttons'],
-                'dpad': self.current_data['dpad'],
-                'ps_button': self.current_data['ps_button'],
-                'touchpad': self.current_data['touchpad'],
+                'buttons': current_data['buttons'],
+                'dpad': current_data['dpad'],
+                'ps_button': current_data['ps_button'],
+                'touchpad': current_data['touchpad'],
                 'sensors': {
                     'raw': {
-                        'gyro': self.current_data['gyro'],
-                        'accelerometer': self.current_data['accelerometer']
+                        'gyro': current_data['gyro'],
+                        'accelerometer': current_data['accelerometer']
                     },
                     'processed': {
-                        'orientation': self.current_data['orientation'],
+                        'orientation': orientation,
                         'orientation_degrees': {
-                            'roll': np.degrees(self.current_data['orientation']['roll']),
-                            'pitch': np.degrees(self.current_data['orientation']['pitch']),
-                            'yaw': np.degrees(self.current_data['orientation']['yaw'])
+                            'roll': math.degrees(orientation['roll']),
+                            'pitch': math.degrees(orientation['pitch']),
+                            'yaw': math.degrees(orientation['yaw'])
                         }
                     }
                 },
-                'axis_locks': self.current_data['axis_locks'],
-                'battery': self.current_data['battery']
+                'axis_locks': axis_locks,
+                'battery': current_data['battery']
             }
             
             with open(filename, 'w') as f:
@@ -1404,22 +1580,24 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
 
     def update_orientation_with_fusion(self, gyro_x, gyro_y, gyro_z, accel_x, accel_y, accel_z, update_triangle=True):
         """Update orientation using complementary filter with gyro and accelerometer data"""
-        current_time = time.time()
-        dt = current_time - self.last_time
-        self.last_time = current_time
+        now_ns = time.monotonic_ns()
+        dt = (now_ns - self.last_time_ns) * 1e-9
+        self.last_time_ns = now_ns
         
         # Complementary filter parameters - adjustable via GUI
         alpha = self.alpha  # Weighting factor from GUI slider
         
         # Calculate pitch and roll from accelerometer data
-        # We use atan2 for a stable calculation in all quadrants
-        accel_roll = np.arctan2(accel_y, accel_z)
-        accel_pitch = np.arctan2(-accel_x, np.sqrt(accel_y**2 + accel_z**2))
+        # We use atan2 for a stable calculation in all quadrants.
+        # These are plain floats, so the math module avoids NumPy's per-call ufunc overhead.
+        accel_roll = math.atan2(accel_y, accel_z)
+        accel_pitch = math.atan2(-accel_x, math.sqrt(accel_y*accel_y + accel_z*accel_z))
         
         # Convert gyro rates to radians/sec with adjustable sensitivity
-        gyro_roll_rate = np.radians(gyro_x / self.gyro_sensitivity)   # X-axis for roll
-        gyro_pitch_rate = np.radians(gyro_z / self.gyro_sensitivity)  # Z-axis for pitch
-        gyro_yaw_rate = np.radians(gyro_y / self.gyro_sensitivity)    # Y-axis for yaw
+        sensitivity = self.gyro_sensitivity
+        gyro_roll_rate = math.radians(gyro_x / sensitivity)   # X-axis for roll
+        gyro_pitch_rate = math.radians(gyro_z / sensitivity)  # Z-axis for pitch
+        gyro_yaw_rate = math.radians(gyro_y / sensitivity)    # Y-axis for yaw
         
         # Apply complementary filter with better responsiveness
         # Roll: primarily gyro, corrected by accelerometer (unless locked)
@@ -1454,25 +1632,36 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
         self.orientation_offset['yaw'] = self.orientation['yaw']
         print(f"Offset captured: {self.orientation_offset}")
 
+    def _schedule_update(self, key, fn):
+        """Queue a widget update; everything queued is applied in one idle callback"""
+        if not self._pending_updates:
+            self.after_idle(self._flush_updates)
+        self._pending_updates[key] = fn  # A newer update for the same widget replaces the old one
+
+    def _flush_updates(self):
+        pending, self._pending_updates = self._pending_updates, {}
+        for fn in pending.values():
+            fn()
+
     def update_alpha(self, value):
         """Update the complementary filter alpha value"""
         self.alpha = float(value)
-        self.alpha_label.config(text=f"Current: {self.alpha:.2f} (Higher = Smoother, Lower = More Responsive)")
+        self._schedule_update('alpha_label', lambda: self.alpha_label.config(text=f"Current: {self.alpha:.2f} (Higher = Smoother, Lower = More Responsive)"))
 
     def update_sensitivity(self, value):
         """Update the gyro sensitivity value"""
         self.gyro_sensitivity = float(value)
-        self.sensitivity_label.config(text=f"Current: {self.gyro_sensitivity:.0f} (Lower = More Sensitive)")
+        self._schedule_update('sensitivity_label', lambda: self.sensitivity_label.config(text=f"Current: {self.gyro_sensitivity:.0f} (Lower = More Sensitive)"))
 
     def update_damping(self, value):
         """Update the damping factor value"""
         self.damping_factor = float(value)
-        self.damping_label.config(text=f"Current: {self.damping_factor:.2f} (Higher = Slower Return to Neutral)")
+        self._schedule_update('damping_label', lambda: self.damping_label.config(text=f"Current: {self.damping_factor:.2f} (Higher = Slower Return to Neutral)"))
 
     def update_polling(self, value):
         """Update the polling rate value"""
         self.polling_rate = int(value)
-        self.polling_label.config(text=f"Current: {self.polling_rate}ms ({1000//self.polling_rate} Hz)")
+        self._schedule_update('polling_label', lambda: self.polling_label.config(text=f"Current: {self.polling_rate}ms ({1000//self.polling_rate} Hz)"))
 
     def reset_settings(self):
         """Reset all settings to default values"""
@@ -1545,12 +1734,8 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
         self.axis_locks = settings['axis_locks']
         self.locked_axis = settings['locked_axis']
         self.tactile_enabled = settings['tactile_enabled']
-        self.threshold1_enabled = settings['threshold1_enabled']
-        self.threshold1_value = settings['threshold1_value']
-        self.threshold2_enabled = settings['threshold2_enabled']
-        self.threshold2_value = settings['threshold2_value']
-        self.threshold3_enabled = settings['threshold3_enabled']
-        self.threshold3_value = settings['threshold3_value']
+        self.threshold_enabled = np.array([settings[f'threshold{n}_enabled'] for n in (1, 2, 3)], dtype=bool)
+        self.threshold_values = np.array([settings[f'threshold{n}_value'] for n in (1, 2, 3)], dtype=np.int16)
         self.tactile_duration = settings['tactile_duration']
         self.tactile_intensity = settings['tactile_intensity']
         
@@ -1579,12 +1764,13 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
             'axis_locks': self.axis_locks,
             'locked_axis': self.locked_axis,
             'tactile_enabled': self.tactile_enabled,
-            'threshold1_enabled': self.threshold1_enabled,
-            'threshold1_value': self.threshold1_value,
-            'threshold2_enabled': self.threshold2_enabled,
-            'threshold2_value': self.threshold2_value,
-            'threshold3_enabled': self.threshold3_enabled,
-            'threshold3_value': self.threshold3_value,
+            # Same flat keys as before; NumPy scalars aren't JSON serializable
+            'threshold1_enabled': bool(self.threshold_enabled[0]),
+            'threshold1_value': int(self.threshold_values[0]),
+            'threshold2_enabled': bool(self.threshold_enabled[1]),
+            'threshold2_value': int(self.threshold_values[1]),
+            'threshold3_enabled': bool(self.threshold_enabled[2]),
+            'threshold3_value': int(self.threshold_values[2]),
             'tactile_duration': self.tactile_duration,
             'tactile_intensity': self.tactile_intensity
         }
@@ -1598,51 +1784,43 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
 
     def update_ui_from_settings(self):
         """Update UI elements to reflect loaded settings"""
-        # Update sliders if they exist (widgets might not be created yet)
-        if hasattr(self, 'alpha_slider'):
-            self.alpha_slider.set(self.alpha)
-            self.sensitivity_slider.set(self.gyro_sensitivity)
-            self.damping_slider.set(self.damping_factor)
-            self.polling_slider.set(self.polling_rate)
-            
-            # Update labels
-            self.update_alpha(self.alpha)
-            self.update_sensitivity(self.gyro_sensitivity)
-            self.update_damping(self.damping_factor)
-            self.update_polling(self.polling_rate)
-        
-        # Update lock buttons if they exist
-        if hasattr(self, 'roll_lock_btn'):
-            self.update_lock_button_colors()
-            if self.locked_axis:
-                self.lock_status_label.config(text=f"{self.locked_axis.capitalize()} axis locked", fg="red")
-            else:
-                self.lock_status_label.config(text="No axis locked", fg="green")
-        
-        # Update tactile feedback controls if they exist
-        if hasattr(self, 'tactile_var'):
-            self.tactile_var.set(self.tactile_enabled)
-        if hasattr(self, 'thresh1_enabled_var'):
-            self.thresh1_enabled_var.set(self.threshold1_enabled)
-        if hasattr(self, 'thresh2_enabled_var'):
-            self.thresh2_enabled_var.set(self.threshold2_enabled)
-        if hasattr(self, 'thresh3_enabled_var'):
-            self.thresh3_enabled_var.set(self.threshold3_enabled)
-        if hasattr(self, 'threshold1_slider'):
-            self.threshold1_slider.set(self.threshold1_value)
-            self.threshold1_label.config(text=f"Value: {self.threshold1_value}")
-        if hasattr(self, 'threshold2_slider'):
-            self.threshold2_slider.set(self.threshold2_value)
-            self.threshold2_label.config(text=f"Value: {self.threshold2_value}")
-        if hasattr(self, 'threshold3_slider'):
-            self.threshold3_slider.set(self.threshold3_value)
-            self.threshold3_label.config(text=f"Value: {self.threshold3_value}")
-        if hasattr(self, 'duration_slider'):
-            self.duration_slider.set(self.tactile_duration)
-            self.duration_label.config(text=f"Value: {self.tactile_duration}ms")
-        if hasattr(self, 'intensity_slider'):
-            self.intensity_slider.set(self.tactile_intensity)
-            self.intensity_label.config(text=f"Value: {self.tactile_intensity}")
+        # load_settings runs before the tabs exist; create_widgets calls us again afterwards
+        if not self._widgets_ready:
+            return
+        
+        self.alpha_slider.set(self.alpha)
+        self.sensitivity_slider.set(self.gyro_sensitivity)
+        self.damping_slider.set(self.damping_factor)
+        self.polling_slider.set(self.polling_rate)
+        
+        # Update labels
+        self.update_alpha(self.alpha)
+        self.update_sensitivity(self.gyro_sensitivity)
+        self.update_damping(self.damping_factor)
+        self.update_polling(self.polling_rate)
+        
+        # Update lock buttons
+        self.update_lock_button_colors()
+        if self.locked_axis:
+            self.lock_status_label.config(text=f"{self.locked_axis.capitalize()} axis locked", fg="red")
+        else:
+            self.lock_status_label.config(text="No axis locked", fg="green")
+        
+        # Update tactile feedback controls (the sliders' commands refresh their labels)
+        self.tactile_var.set(self.tactile_enabled)
+        self.thresh1_enabled_var.set(bool(self.threshold_enabled[0]))
+        self.thresh2_enabled_var.set(bool(self.threshold_enabled[1]))
+        self.thresh3_enabled_var.set(bool(self.threshold_enabled[2]))
+        self.threshold1_slider.set(int(self.threshold_values[0]))
+        self.threshold2_slider.set(int(self.threshold_values[1]))
+        self.threshold3_slider.set(int(self.threshold_values[2]))
+        self.duration_slider.set(self.tactile_duration)
+        self.intensity_slider.set(self.tactile_intensity)
+        self.update_threshold1_value(self.threshold_values[0])
+        self.update_threshold2_value(self.threshold_values[1])
+        self.update_threshold3_value(self.threshold_values[2])
+        self.update_tactile_duration(self.tactile_duration)
+        self.update_tactile_intensity(self.tactile_intensity)
 
     def toggle_axis_lock(self, axis):
         """Toggle axis lock - only one axis can be locked at a time"""
@@ -1677,121 +1855,37 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
             self.yaw_lock_btn.config(bg="red", fg="white")
 
     def update_gyro_triangle(self, roll, pitch, yaw):
-        """Update the 3D triangle to show controller orientation, adjusted for a custom offset."""
-        # Remove previous triangle if it exists
-        if self.gyro_triangle is not None:
-            self.gyro_triangle.remove()
-        
+        """Update the triangle to show controller orientation, adjusted for a custom offset."""
         # Apply the custom orientation offset
         display_roll = roll - self.orientation_offset['roll']
         display_pitch = pitch - self.orientation_offset['pitch']
         display_yaw = yaw - self.orientation_offset['yaw']
         
-        # Create a 30-30-120 degree triangle with depth
-        # Base triangle dimensions
-        base_width = 500
-        depth = 200
-        
-        # Calculate triangle points for 30-30-120 degree triangle
-        # Top point (controller facing direction) at 120 degrees
-        # Bottom points at 30 degrees each
-        height = base_width * np.tan(np.radians(30))  # Height from base to top
-        
-        # Front face (controller face)
-        front_triangle = np.array([
-            [-base_width/2, -height/2, depth/2],   # Bottom left
-            [base_width/2, -height/2, depth/2],    # Bottom right
-            [0, height/2, depth/2]                 # Top center (controller facing)
-        ])
-        
-        # Back face
-        back_triangle = np.array([
-            [-base_width/2, -height/2, -depth/2],  # Bottom left
-            [base_width/2, -height/2, -depth/2],   # Bottom right
-            [0, height/2, -depth/2]                # Top center
-        ])
-        
-        # Apply rotation based on gyro data
-        from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-        
-        # Apply rotations using the fused orientation angles
-        def rotate_point(point, roll, pitch, yaw):
-            x, y, z = point
-            
-            # Yaw rotation (turning left/right)
-            if abs(yaw) > 0.001:
-                cos_yaw = np.cos(yaw)
-                sin_yaw = np.sin(yaw)
-                x_new = x * cos_yaw - y * sin_yaw
-                y_new = x * sin_yaw + y * cos_yaw
-                x, y = x_new, y_new
-            
-            # Roll rotation (side tilting)
-            if abs(roll) > 0.001:
-                cos_roll = np.cos(roll)
-                sin_roll = np.sin(roll)
-                y_new = y * cos_roll - z * sin_roll
-                z_new = y * sin_roll + z * cos_roll
-                y, z = y_new, z_new
-            
-            # Pitch rotation (forward/backward tilt)
-            if abs(pitch) > 0.001:
-                cos_pitch = np.cos(pitch)
-                sin_pitch = np.sin(pitch)
-                x_new = x * cos_pitch + z * sin_pitch
-                z_new = -x * sin_pitch + z * cos_pitch
-                x, z = x_new, z_new
-            
-            return [x, y, z]
+        cr, sr = math.cos(display_roll), math.sin(display_roll)
+        cp, sp = math.cos(display_pitch), math.sin(display_pitch)
+        cy, sy = math.cos(display_yaw), math.sin(display_yaw)
+        rot_roll = np.array([[1, 0, 0], [0, cr, -sr], [0, sr, cr]])    # Side tilting
+        rot_pitch = np.array([[cp, 0, sp], [0, 1, 0], [-sp, 0, cp]])   # Forward/backward tilt
+        rot_yaw = np.array([[cy, -sy, 0], [sy, cy, 0], [0, 0, 1]])     # Turning left/right
         
-        # Rotate all points using the offset-adjusted orientation
-        rotated_front = np.array([rotate_point(p, display_roll, display_pitch, display_yaw) for p in front_triangle])
-        rotated_back = np.array([rotate_point(p, display_roll, display_pitch, display_yaw) for p in back_triangle])
+        # Yaw, then roll, then pitch, then the camera: all six vertices in one matmul
+        screen = (_GYRO_VIEW @ rot_pitch @ rot_roll @ rot_yaw) @ _GYRO_BODY
+        points = screen[:2].T
+        depth = screen[2]
         
-        # Create 3D object faces
-        faces = []
+        # Draw far faces first so near ones cover them
+        faces = sorted(_GYRO_FACES, key=lambda face: depth[face].mean())
+        self.gyro_triangle.set_verts([points[face] for face in faces])
         
-        # Front and back faces
-        faces.append(rotated_front)
-        faces.append(rotated_back)
-        
-        # Side faces (connecting front and back)
-        faces.append([rotated_front[0], rotated_front[1], rotated_back[1], rotated_back[0]])  # Bottom
-        faces.append([rotated_front[1], rotated_front[2], rotated_back[2], rotated_back[1]])  # Right
-        faces.append([rotated_front[2], rotated_front[0], rotated_back[0], rotated_back[2]])  # Left
-        
-        # Create the 3D object
-        poly3d = Poly3DCollection(faces, alpha=0.7, facecolor='green', edgecolor='black')
-        
-        # Add to the plot
-        self.gyro_triangle = self.ax_gyro.add_collection3d(poly3d)
-        
-        # Add red line for locked axis if any
+        # Red line for locked axis if any
         if self.locked_axis:
-            self.add_locked_axis_indicator(display_roll, display_pitch, display_yaw)
+            self.add_locked_axis_indicator()
 
-    def add_locked_axis_indicator(self, roll, pitch, yaw):
-        """Add a red line to show which axis is locked"""
-        # Remove previous indicator if it exists
-        if hasattr(self, 'lock_indicator') and self.lock_indicator is not None:
-            self.lock_indicator.remove()
-        
-        # Create a line along the locked axis
-        if self.locked_axis == 'roll':
-            # Red line along Y-axis (roll axis - side tilting)
-            y_line = np.array([[0, -300, 0], [0, 300, 0]])
-            self.lock_indicator, = self.ax_gyro.plot(y_line[:, 0], y_line[:, 1], y_line[:, 2], 
-                                                   'r-', linewidth=3, alpha=0.8)
-        elif self.locked_axis == 'pitch':
-            # Red line along X-axis (pitch axis - forward/backward tilt)
-            x_line = np.array([[-300, 0, 0], [300, 0, 0]])
-            self.lock_indicator, = self.ax_gyro.plot(x_line[:, 0], x_line[:, 1], x_line[:, 2], 
-                                                   'r-', linewidth=3, alpha=0.8)
-        elif self.locked_axis == 'yaw':
-            # Red line along Z-axis (yaw axis - turning left/right)
-            z_line = np.array([[0, 0, -300], [0, 0, 300]])
-            self.lock_indicator, = self.ax_gyro.plot(z_line[:, 0], z_line[:, 1], z_line[:, 2], 
-                                                   'r-', linewidth=3, alpha=0.8)
+    def add_locked_axis_indicator(self):
+        """Point the red lock line along the locked axis"""
+        line = _LOCK_LINES.get(self.locked_axis)
+        if line is not None:
+            self.lock_indicator.set_data(line[0], line[1])
 
     def set_lightbar(self):
         r = self.red.get()
@@ -1903,15 +1997,15 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
         thresh1_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         thresh1_header = tk.Frame(thresh1_frame)
         thresh1_header.pack(fill=tk.X)
-        self.thresh1_enabled_var = tk.BooleanVar(value=self.threshold1_enabled)
+        self.thresh1_enabled_var = tk.BooleanVar(value=bool(self.threshold_enabled[0]))
         tk.Checkbutton(thresh1_header, text="", variable=self.thresh1_enabled_var, 
                       command=self.update_threshold1_enabled).pack(side=tk.LEFT)
         tk.Label(thresh1_header, text="Threshold 1 (Low):", font=("Arial", 9)).pack(side=tk.LEFT)
         self.threshold1_slider = tk.Scale(thresh1_frame, from_=0, to=255, orient=tk.HORIZONTAL,
                                         command=self.update_threshold1_value, length=150)
-        self.threshold1_slider.set(self.threshold1_value)
+        self.threshold1_slider.set(int(self.threshold_values[0]))
         self.threshold1_slider.pack(fill=tk.X)
-        self.threshold1_label = tk.Label(thresh1_frame, text=f"Value: {self.threshold1_value}", font=("Arial", 8))
+        self.threshold1_label = tk.Label(thresh1_frame, text=f"Value: {self.threshold_values[0]}", font=("Arial", 8))
         self.threshold1_label.pack(anchor='w')
         
         # Threshold 2 (Medium)
@@ -1919,15 +2013,15 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
         thresh2_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         thresh2_header = tk.Frame(thresh2_frame)
         thresh2_header.pack(fill=tk.X)
-        self.thresh2_enabled_var = tk.BooleanVar(value=self.threshold2_enabled)
+        self.thresh2_enabled_var = tk.BooleanVar(value=bool(self.threshold_enabled[1]))
         tk.Checkbutton(thresh2_header, text="", variable=self.thresh2_enabled_var, 
                       command=self.update_threshold2_enabled).pack(side=tk.LEFT)
         tk.Label(thresh2_header, text="Threshold 2 (Med):", font=("Arial", 9)).pack(side=tk.LEFT)
         self.threshold2_slider = tk.Scale(thresh2_frame, from_=0, to=255, orient=tk.HORIZONTAL,
                                         command=self.update_threshold2_value, length=150)
-        self.threshold2_slider.set(self.threshold2_value)
+        self.threshold2_slider.set(int(self.threshold_values[1]))
         self.threshold2_slider.pack(fill=tk.X)
-        self.threshold2_label = tk.Label(thresh2_frame, text=f"Value: {self.threshold2_value}", font=("Arial", 8))
+        self.threshold2_label = tk.Label(thresh2_frame, text=f"Value: {self.threshold_values[1]}", font=("Arial", 8))
         self.threshold2_label.pack(anchor='w')
         
         # Threshold 3 (High)
@@ -1935,15 +2029,15 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
         thresh3_frame.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(5, 0))
         thresh3_header = tk.Frame(thresh3_frame)
         thresh3_header.pack(fill=tk.X)
-        self.thresh3_enabled_var = tk.BooleanVar(value=self.threshold3_enabled)
+        self.thresh3_enabled_var = tk.BooleanVar(value=bool(self.threshold_enabled[2]))
         tk.Checkbutton(thresh3_header, text="", variable=self.thresh3_enabled_var, 
                       command=self.update_threshold3_enabled).pack(side=tk.LEFT)
         tk.Label(thresh3_header, text="Threshold 3 (High):", font=("Arial", 9)).pack(side=tk.LEFT)
         self.threshold3_slider = tk.Scale(thresh3_frame, from_=0, to=255, orient=tk.HORIZONTAL,
                                         command=self.update_threshold3_value, length=150)
-        self.threshold3_slider.set(self.threshold3_value)
+        self.threshold3_slider.set(int(self.threshold_values[2]))
         self.threshold3_slider.pack(fill=tk.X)
-        self.threshold3_label = tk.Label(thresh3_frame, text=f"Value: {self.threshold3_value}", font=("Arial", 8))
+        self.threshold3_label = tk.Label(thresh3_frame, text=f"Value: {self.threshold_values[2]}", font=("Arial", 8))
         self.threshold3_label.pack(anchor='w')
         
         # Tactile settings
@@ -1980,6 +2074,7 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
         # Create canvas for trigger visualization
         self.trigger_canvas = tk.Canvas(viz_frame, height=60, bg='white')
         self.trigger_canvas.pack(fill=tk.X, pady=2)
+        self._viz_items = {}  # canvas item IDs, created on the first draw
         
         # Draw trigger bars
         self.draw_trigger_visualization(0, 0)
@@ -1997,12 +2092,8 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
         
         # Initialize tactile feedback settings
         self.tactile_enabled = False
-        self.threshold1_enabled = True
-        self.threshold1_value = 64
-        self.threshold2_enabled = True
-        self.threshold2_value = 128
-        self.threshold3_enabled = True
-        self.threshold3_value = 192
+        self.threshold_enabled = np.array([True, True, True])
+        self.threshold_values = np.array([64, 128, 192], dtype=np.int16)
         self.tactile_duration = 50  # milliseconds - short for strong rumble
         self.tactile_intensity = 255  # strong intensity
         
@@ -2018,13 +2109,13 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
     def update_strong_rumble(self, value):
         """Update strong motor rumble value"""
         self.strong_rumble = int(value)
-        self.strong_label.config(text=f"Intensity: {self.strong_rumble}")
+        self._schedule_update('strong_label', lambda: self.strong_label.config(text=f"Intensity: {self.strong_rumble}"))
         # Don't auto-apply, let user use Apply button
 
     def update_weak_rumble(self, value):
         """Update weak motor rumble value"""
         self.weak_rumble = int(value)
-        self.weak_label.config(text=f"Intensity: {self.weak_rumble}")
+        self._schedule_update('weak_label', lambda: self.weak_label.config(text=f"Intensity: {self.weak_rumble}"))
         # Don't auto-apply, let user use Apply button
 
     def set_preset_rumble(self, strong, weak):
@@ -2056,7 +2147,9 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
     def set_rumble_simple(self, left_rumble=0, right_rumble=0):
         """Set rumble using simple 0x05 report"""
         # Output report: [0x05, 0xFF, 0x04, 0x00, left_rumble, right_rumble, r, g, b, ...]
-        report = [0x05, 0xFF, 0x04, 0x00, left_rumble, right_rumble, 0, 0, 0] + [0]*23
+        report = self._simple_report
+        report[4] = left_rumble
+        report[5] = right_rumble
         self.h.write(bytes(report))
 
     def set_rumble_0x11(self, left_rumble=0, right_rumble=0, r=0, g=0, b=0):
@@ -2065,7 +2158,12 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
         # Byte 4: 0xf3 enables rumble, 0xf0 disables
         # Byte 7: right/weak rumble, Byte 8: left/strong rumble
         # Byte 9-11: RGB
-        report = [0x11, 0xc0, 0x20, 0xf3, 0xf3, 0x00, 0x00, right_rumble, left_rumble, r, g, b] + [0]*66
+        report = self._full_report
+        report[7] = right_rumble
+        report[8] = left_rumble
+        report[9] = r
+        report[10] = g
+        report[11] = b
         self.h.write(bytes(report))
 
     def test_rumble(self):
@@ -2100,49 +2198,58 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
 
     def update_threshold1_enabled(self):
         """Update threshold 1 enabled state"""
-        self.threshold1_enabled = self.thresh1_enabled_var.get()
-        print(f"Threshold 1 enabled: {self.threshold1_enabled}")
+        self.threshold_enabled[0] = self.thresh1_enabled_var.get()
+        print(f"Threshold 1 enabled: {self.threshold_enabled[0]}")
 
     def update_threshold2_enabled(self):
         """Update threshold 2 enabled state"""
-        self.threshold2_enabled = self.thresh2_enabled_var.get()
-        print(f"Threshold 2 enabled: {self.threshold2_enabled}")
+        self.threshold_enabled[1] = self.thresh2_enabled_var.get()
+        print(f"Threshold 2 enabled: {self.threshold_enabled[1]}")
 
     def update_threshold3_enabled(self):
         """Update threshold 3 enabled state"""
-        self.threshold3_enabled = self.thresh3_enabled_var.get()
-        print(f"Threshold 3 enabled: {self.threshold3_enabled}")
+        self.threshold_enabled[2] = self.thresh3_enabled_var.get()
+        print(f"Threshold 3 enabled: {self.threshold_enabled[2]}")
 
     def update_threshold1_value(self, value):
         """Update threshold 1 value"""
-        self.threshold1_value = int(value)
-        self.threshold1_label.config(text=f"Value: {self.threshold1_value}")
+        self.threshold_values[0] = int(value)
+        self._schedule_update('threshold1_label', lambda: self.threshold1_label.config(text=f"Value: {self.threshold_values[0]}"))
 
     def update_threshold2_value(self, value):
         """Update threshold 2 value"""
-        self.threshold2_value = int(value)
-        self.threshold2_label.config(text=f"Value: {self.threshold2_value}")
+        self.threshold_values[1] = int(value)
+        self._schedule_update('threshold2_label', lambda: self.threshold2_label.config(text=f"Value: {self.threshold_values[1]}"))
 
     def update_threshold3_value(self, value):
         """Update threshold 3 value"""
-        self.threshold3_value = int(value)
-        self.threshold3_label.config(text=f"Value: {self.threshold3_value}")
+        self.threshold_values[2] = int(value)
+        self._schedule_update('threshold3_label', lambda: self.threshold3_label.config(text=f"Value: {self.threshold_values[2]}"))
 
     def update_tactile_duration(self, value):
         """Update tactile feedback duration"""
         self.tactile_duration = int(value)
-        self.duration_label.config(text=f"Value: {self.tactile_duration}ms")
+        self._schedule_update('duration_label', lambda: self.duration_label.config(text=f"Value: {self.tactile_duration}ms"))
 
     def update_tactile_intensity(self, value):
         """Update tactile feedback intensity"""
         self.tactile_intensity = int(value)
-        self.intensity_label.config(text=f"Value: {self.tactile_intensity}")
+        self._schedule_update('intensity_label', lambda: self.intensity_label.config(text=f"Value: {self.tactile_intensity}"))
 
     def draw_trigger_visualization(self, l2_value, r2_value):
         """Draw trigger visualization bars horizontally with three thresholds"""
-        self.trigger_canvas.delete("all")
-        
-        canvas_width = self.trigger_canvas.winfo_width()
+        canvas = self.trigger_canvas
+        items = self._viz_items
+        if not items:
+            # Create every canvas item once; later calls only move/reconfigure them
+            for trigger, fill, outline in (('l2', 'blue', 'darkblue'), ('r2', 'red', 'darkred')):
+                items[f'{trigger}_bg'] = canvas.create_rectangle(0, 0, 0, 0, fill='lightgray', outline='gray')
+                items[f'{trigger}_fill'] = canvas.create_rectangle(0, 0, 0, 0, fill=fill, outline=outline)
+                for n, (color, dash) in enumerate(zip(_THRESHOLD_COLORS, _THRESHOLD_DASHES), 1):
+                    items[f'{trigger}_t{n}'] = canvas.create_line(0, 0, 0, 0, fill=color, width=2, dash=dash)
+                items[f'{trigger}_label'] = canvas.create_text(0, 0, font=("Arial", 8))
+        
+        canvas_width = canvas.winfo_width()
         if canvas_width <= 1:  # Canvas not yet sized
             canvas_width = 300
         
@@ -2150,125 +2257,79 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
         bar_width = (canvas_width - 40) // 2
         y_offset = 20
         
-        # L2 bar (blue) - horizontal
+        # L2 bar (blue) on the left, R2 bar (red) on the right - horizontal
         l2_x = 10
-        l2_y = y_offset
-        l2_fill_width = int((l2_value / 255.0) * bar_width)
-        
-        # L2 background
-        self.trigger_canvas.create_rectangle(l2_x, l2_y, l2_x + bar_width, l2_y + bar_height, 
-                                          fill='lightgray', outline='gray')
-        # L2 fill
-        if l2_fill_width > 0:
-            self.trigger_canvas.create_rectangle(l2_x, l2_y, l2_x + l2_fill_width, l2_y + bar_height, 
-                                              fill='blue', outline='darkblue')
-        
-        # L2 threshold lines (vertical) - different colors for each threshold
-        if self.threshold1_enabled:
-            threshold_x = l2_x + int((self.threshold1_value / 255.0) * bar_width)
-            self.trigger_canvas.create_line(threshold_x, l2_y, threshold_x, l2_y + bar_height, 
-                                          fill='green', width=2, dash=(3, 3))
-        
-        if self.threshold2_enabled:
-            threshold_x = l2_x + int((self.threshold2_value / 255.0) * bar_width)
-            self.trigger_canvas.create_line(threshold_x, l2_y, threshold_x, l2_y + bar_height, 
-                                          fill='orange', width=2, dash=(5, 5))
-        
-        if self.threshold3_enabled:
-            threshold_x = l2_x + int((self.threshold3_value / 255.0) * bar_width)
-            self.trigger_canvas.create_line(threshold_x, l2_y, threshold_x, l2_y + bar_height, 
-                                          fill='red', width=2, dash=(7, 7))
-        
-        # L2 label
-        self.trigger_canvas.create_text(l2_x + bar_width//2, l2_y + bar_height + 15, 
-                                      text=f"L2: {l2_value}", font=("Arial", 8))
-        
-        # R2 bar (red) - horizontal
         r2_x = l2_x + bar_width + 20
-        r2_y = y_offset
-        r2_fill_width = int((r2_value / 255.0) * bar_width)
-        
-        # R2 background
-        self.trigger_canvas.create_rectangle(r2_x, r2_y, r2_x + bar_width, r2_y + bar_height, 
-                                          fill='lightgray', outline='gray')
-        # R2 fill
-        if r2_fill_width > 0:
-            self.trigger_canvas.create_rectangle(r2_x, r2_y, r2_x + r2_fill_width, r2_y + bar_height, 
-                                              fill='red', outline='darkred')
-        
-        # R2 threshold lines (vertical) - different colors for each threshold
-        if self.threshold1_enabled:
-            threshold_x = r2_x + int((self.threshold1_value / 255.0) * bar_width)
-            self.trigger_canvas.create_line(threshold_x, r2_y, threshold_x, r2_y + bar_height, 
-                                          fill='green', width=2, dash=(3, 3))
-        
-        if self.threshold2_enabled:
-            threshold_x = r2_x + int((self.threshold2_value / 255.0) * bar_width)
-            self.trigger_canvas.create_line(threshold_x, r2_y, threshold_x, r2_y + bar_height, 
-                                          fill='orange', width=2, dash=(5, 5))
-        
-        if self.threshold3_enabled:
-            threshold_x = r2_x + int((self.threshold3_value / 255.0) * bar_width)
-            self.trigger_canvas.create_line(threshold_x, r2_y, threshold_x, r2_y + bar_height, 
-                                          fill='red', width=2, dash=(7, 7))
-        
-        # R2 label
-        self.trigger_canvas.create_text(r2_x + bar_width//2, r2_y + bar_height + 15, 
-                                      text=f"R2: {r2_value}", font=("Arial", 8))
+        for trigger, x, value in (('l2', l2_x, l2_value), ('r2', r2_x, r2_value)):
+            y = y_offset
+            fill_width = int((value / 255.0) * bar_width)
+            
+            # Background
+            canvas.coords(items[f'{trigger}_bg'], x, y, x + bar_width, y + bar_height)
+            # Fill
+            if fill_width > 0:
+                canvas.coords(items[f'{trigger}_fill'], x, y, x + fill_width, y + bar_height)
+                canvas.itemconfig(items[f'{trigger}_fill'], state='normal')
+            else:
+                canvas.itemconfig(items[f'{trigger}_fill'], state='hidden')
+            
+            # Threshold lines (vertical) - different colors for each threshold
+            for n, (enabled, threshold) in enumerate(zip(self.threshold_enabled, self.threshold_values), 1):
+                line = items[f'{trigger}_t{n}']
+                if enabled:
+                    threshold_x = x + int((threshold / 255.0) * bar_width)
+                    canvas.coords(line, threshold_x, y, threshold_x, y + bar_height)
+                    canvas.itemconfig(line, state='normal')
+                else:
+                    canvas.itemconfig(line, state='hidden')
+            
+            # Label
+            canvas.coords(items[f'{trigger}_label'], x + bar_width//2, y + bar_height + 15)
+            canvas.itemconfig(items[f'{trigger}_label'], text=f"{trigger.upper()}: {value}")
 
     def check_tactile_feedback(self, l2_value, r2_value):
         """Check if triggers cross any enabled thresholds and trigger tactile feedback with hysteresis"""
         if not self.tactile_enabled:
             return
         
-        # Check L2 trigger threshold crossings (both up and down)
-        if self.threshold1_enabled:
-            self.check_threshold_crossing("L2", l2_value, self.prev_l2_value, self.threshold1_value, 1)
-        if self.threshold2_enabled:
-            self.check_threshold_crossing("L2", l2_value, self.prev_l2_value, self.threshold2_value, 2)
-        if self.threshold3_enabled:
-            self.check_threshold_crossing("L2", l2_value, self.prev_l2_value, self.threshold3_value, 3)
-        
-        # Check R2 trigger threshold crossings (both up and down)
-        if self.threshold1_enabled:
-            self.check_threshold_crossing("R2", r2_value, self.prev_r2_value, self.threshold1_value, 1)
-        if self.threshold2_enabled:
-            self.check_threshold_crossing("R2", r2_value, self.prev_r2_value, self.threshold2_value, 2)
-        if self.threshold3_enabled:
-            self.check_threshold_crossing("R2", r2_value, self.prev_r2_value, self.threshold3_value, 3)
+        # Branchless crossing masks (up: prev < t <= cur, down: prev > t >= cur) over all
+        # three thresholds at once; only the crossed indices reach Python-level code
+        t = self.threshold_values
+        en = self.threshold_enabled
+        l2_cross = en & (((self.prev_l2_value < t) & (l2_value >= t)) | ((self.prev_l2_value > t) & (l2_value <= t)))
+        r2_cross = en & (((self.prev_r2_value < t) & (r2_value >= t)) | ((self.prev_r2_value > t) & (r2_value <= t)))
+        for i in np.flatnonzero(l2_cross):
+            self._fire_haptic("L2", l2_value, int(t[i]))
+        for i in np.flatnonzero(r2_cross):
+            self._fire_haptic("R2", r2_value, int(t[i]))
         
         # Update previous values for next check
         self.prev_l2_value = l2_value
         self.prev_r2_value = r2_value
 
-    def check_threshold_crossing(self, trigger, current_value, prev_value, threshold_value, threshold_num):
-        """Check if trigger crosses threshold in either direction with hysteresis protection"""
+    def _fire_haptic(self, trigger, current_value, threshold_value):
+        """Rumble for a threshold crossing unless hysteresis suppresses it"""
         # Determine which trigger's last rumble state to check
         if trigger == "L2":
             last_rumble_threshold = self.l2_last_rumble_threshold
         else:  # R2
             last_rumble_threshold = self.r2_last_rumble_threshold
         
-        # Check if we crossed the threshold in either direction
-        crossed_up = prev_value < threshold_value and current_value >= threshold_value
-        crossed_down = prev_value > threshold_value and current_value <= threshold_value
-        
-        if crossed_up or crossed_down:
-            # Check if we're far enough away from the last rumble threshold
-            can_rumble = True
-            if last_rumble_threshold is not None and last_rumble_threshold == threshold_value:
-                # Only apply hysteresis if we're crossing the same threshold again
-                # Check if we've moved at least hysteresis_margin points away from this threshold
-                distance_from_threshold = abs(current_value - threshold_value)
-                can_rumble = distance_from_threshold >= self.hysteresis_margin
-            
-            if can_rumble:
-                self.trigger_tactile_feedback(trigger)
-                # Update the last rumble threshold for this trigger
-                if trigger == "L2":
-                    self.l2_last_rumble_threshold = threshold_value
-                else:  # R2
-                    self.r2_last_rumble_threshold = threshold_value
+        # Check if we're far enough away from the last rumble threshold
+        can_rumble = True
+        if last_rumble_threshold is not None and last_rumble_threshold == threshold_value:
+            # Only apply hysteresis if we're crossing the same threshold again
+            # Check if we've moved at least hysteresis_margin points away from this threshold
+            distance_from_threshold = abs(current_value - threshold_value)
+            can_rumble = distance_from_threshold >= self.hysteresis_margin
+        
+        if can_rumble:
+            self.trigger_tactile_feedback(trigger)
+            # Update the last rumble threshold for this trigger
+            if trigger == "L2":
+                self.l2_last_rumble_threshold = threshold_value
+            else:  # R2
+                self.r2_last_rumble_threshold = threshold_value
 
     def trigger_tactile_feedback(self, trigger):
         """Trigger tactile feedback for specified trigger"""
@@ -2300,7 +2361,10 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
         """Clean shutdown of the application"""
         print("Shutting down...")
         
-        # Close HID device
+        # Stop the poll thread, then close HID device
+        self.is_running = False
+        if hasattr(self, '_poll_thread'):
+            self._poll_thread.join(timeout=1.0)
         if hasattr(self, 'h'):
             self.h.close()
         
@@ -2342,6 +2406,11 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
             except Exception as e:
                 print(f"Error stopping tray icon: {e}")
         
+        # Stop the poll thread before closing the device it reads from
+        self.is_running = False
+        if hasattr(self, '_poll_thread') and self._poll_thread is not threading.current_thread():
+            self._poll_thread.join(timeout=1.0)
+        
         # Close connections
         self.udp_socket.close()
         self.h.close()
@@ -2389,7 +2458,6 @@ Polling Rate: {self.polling_rate}ms (~{1000//self.polling_rate} Hz)
                     # When Option is held, we need to get the base key from keycode
                     # Option+S: event.keysym might be 'ssharp', event.keycode is 115 (for 's')
                     # Option+D: event.keysym might be 'partialderivative', event.keycode is 100 (for 'd')
-                    import string
                     
                     # Try to get the base key from keycode first
                     if hasattr(event, 'keycode'):